@@ -1,15 +1,23 @@
 # app.py (수정된 버전)
 import streamlit as st
-from auth import AuthManager, auth_page
-from post import PostManager, create_post_form, display_posts_feed, post_detail_page
+import pandas as pd
+from auth import auth_page
+from post import create_post_form, display_posts_feed, post_detail_page
 from sidebar import sidebar_navigation, profile_page, my_posts_page, liked_posts_page, all_users_page
-from follow import FollowManager
-from factory_manager import FactoryManager
+from shared_store import get_shared_managers
 from factory_dashboard import factory_dashboard_page, factory_detail_page
 from factory_integration import integrate_factory_with_social_feed, schedule_factory_monitoring
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 
+# 피드 필터 -> PostManager.get_posts_feed 조건 (limit 적용 전에 걸러짐)
+FEED_FILTERS = {
+    "전체": {},
+    "일반 포스트만": {'exclude_users': ["🏭_Factory_System"]},
+    "팩토리 알림만": {'usernames': ["🏭_Factory_System"]},
+    "긴급 상황만": {'kind': ['factory_status', 'factory_emergency'], 'priority': ['emergency', 'high']},
+}
+
 # 한글 폰트 설정
 plt.rcParams['font.family'] = 'Malgun Gothic'  # Windows
 
@@ -37,11 +45,12 @@ if 'target_user_id' not in st.session_state:
 if 'selected_factory_id' not in st.session_state:
     st.session_state.selected_factory_id = None
 
-# 매니저 초기화
-auth_manager = AuthManager()
-post_manager = PostManager()
-follow_manager = FollowManager()
-factory_manager = FactoryManager()
+# 매니저 초기화 (서버 프로세스당 한 번 로드되어 모든 세션이 공유)
+shared_managers = get_shared_managers()
+auth_manager = shared_managers.auth_manager
+post_manager = shared_managers.post_manager
+follow_manager = shared_managers.follow_manager
+factory_manager = shared_managers.factory_manager
 
 # 자동 모니터링 시작 (선택사항)
 if 'monitoring_started' not in st.session_state:
@@ -52,7 +61,7 @@ if 'monitoring_started' not in st.session_state:
 def main_page():
     """메인 페이지 (로그인 후)"""
     # 사이드바 네비게이션
-    current_page = sidebar_navigation()
+    current_page = sidebar_navigation(factory_manager)
     
     # 페이지 라우팅
     if current_page == 'home':
@@ -119,10 +128,7 @@ def home_page():
             
             with col1:
                 if st.button("🔄 모든 팩토리 상태 업데이트"):
-                    updated_count = 0
-                    for factory_id in factory_manager.factories.keys():
-                        factory_manager.update_factory_status(factory_id)
-                        updated_count += 1
+                    updated_count = len(factory_manager.update_all_factories())
                     st.success(f"{updated_count}개 팩토리 상태가 업데이트되었습니다!")
                     st.rerun()
             
@@ -157,46 +163,82 @@ def display_enhanced_posts_feed(post_manager, current_username, auth_manager=Non
     with col_filter:
         feed_filter = st.selectbox(
             "피드 필터", 
-            ["전체", "일반 포스트만", "팩토리 알림만", "긴급 상황만"]
+            list(FEED_FILTERS)
         )
     with col_count:
-        post_count = st.selectbox("표시 개수", [10, 20, 30, 50], index=1)
-    
-    posts = post_manager.get_posts_feed(post_count)
-    
-    # 필터링
-    if feed_filter == "일반 포스트만":
-        posts = posts[posts['username'] != "🏭_Factory_System"]
-    elif feed_filter == "팩토리 알림만":
-        posts = posts[posts['username'] == "🏭_Factory_System"]
-    elif feed_filter == "긴급 상황만":
-        emergency_posts = []
-        for _, post in posts.iterrows():
-            if post['username'] == "🏭_Factory_System":
-                try:
-                    if isinstance(post['content'], str):
-                        content_data = json.loads(post['content'])
-                        if content_data.get('priority') in ['emergency', 'high']:
-                            emergency_posts.append(post)
-                except:
-                    pass
-        if emergency_posts:
-            import pandas as pd
-            posts = pd.DataFrame(emergency_posts)
-        else:
-            posts = pd.DataFrame()
+        post_count = st.selectbox("표시 개수", [10, 20, 30, 50, 100, 200], index=1)
+    col_more, col_window = st.columns(2)
+    with col_more:
+        load_more = st.toggle("♾️ 더 보기 모드", key="feed_load_more",
+                              help="표시 개수만큼씩 이전 게시물을 이어서 불러옵니다")
+    with col_window:
+        windowed = st.toggle("🪟 창 단위로 그리기", value=True, key="feed_windowed",
+                             help="10개씩만 온전히 그리고 나머지는 펼치기 전까지 한 줄 요약으로 표시합니다")
+    
+    filters = FEED_FILTERS[feed_filter]
+    next_cursor = None
+    if load_more:
+        posts, next_cursor = load_feed_pages(post_manager, post_count, feed_filter)
+    else:
+        posts = post_manager.get_posts_feed(post_count, **filters)
     
     if len(posts) == 0:
         st.write("표시할 게시물이 없습니다.")
         if feed_filter == "긴급 상황만":
             st.info("현재 긴급 상황이 없습니다. 🎉")
+        load_more_button(next_cursor)
         return
     
     # enhanced_post_display에서 import
-    from enhanced_post_display import display_enhanced_post
+    from enhanced_post_display import display_enhanced_post, display_posts_window
+    
+    # 리포스트 원본 게시물을 한 번에 조회
+    original_posts = post_manager.get_posts_by_ids(posts['original_post_id'].dropna().tolist())
+    liked_post_ids = post_manager.liked_post_ids(current_username, posts['post_id'].tolist())
+    profile_emojis = auth_manager.get_profile_emojis(posts['username'].unique()) if auth_manager else None
+    
+    def render_post(post):
+        display_enhanced_post(post, post_manager, current_username, show_actions=True,
+                              auth_manager=auth_manager, original_posts=original_posts,
+                              liked_post_ids=liked_post_ids, profile_emojis=profile_emojis)
+    
+    if windowed:
+        display_posts_window(posts, render_post, window_key='home_feed_window',
+                             image_catalog=post_manager.image_catalog)
+    else:
+        for post in posts.to_dict('records'):
+            render_post(post)
     
-    for _, post in posts.iterrows():
-        display_enhanced_post(post.to_dict(), post_manager, current_username, show_actions=True, auth_manager=auth_manager)
+    load_more_button(next_cursor)
+
+def load_feed_pages(post_manager, page_size, feed_filter="전체"):
+    """지금까지 불러온 피드 게시물과 다음 커서 (불러온 게시물 ID는 세션에 두고, 새 페이지만 커서로 조회)"""
+    # 페이지 크기나 필터가 바뀌면 처음부터 다시 불러오기
+    if st.session_state.get('feed_page_key') != (page_size, feed_filter):
+        st.session_state.feed_page_key = (page_size, feed_filter)
+        st.session_state.feed_post_ids = []
+        st.session_state.feed_next_cursor = None
+        st.session_state.feed_fetch_page = True
+    
+    # 첫 페이지이거나 더 보기를 누른 경우에만 다음 페이지 조회
+    if st.session_state.pop('feed_fetch_page', False):
+        page, next_cursor = post_manager.get_posts_page(st.session_state.feed_next_cursor, page_size,
+                                                        **FEED_FILTERS[feed_filter])
+        st.session_state.feed_post_ids = st.session_state.feed_post_ids + page['post_id'].tolist()
+        st.session_state.feed_next_cursor = next_cursor
+    
+    # 이미 불러온 게시물은 ID로만 다시 조회 (좋아요 수 등은 최신 값, 삭제된 게시물은 빠짐)
+    loaded = post_manager.get_posts_by_ids(st.session_state.feed_post_ids)
+    posts = [loaded[post_id] for post_id in st.session_state.feed_post_ids if post_id in loaded]
+    return pd.DataFrame(posts), st.session_state.feed_next_cursor
+
+def load_more_button(next_cursor):
+    """다음 페이지가 있으면 더 보기 버튼 표시"""
+    if next_cursor is None:
+        return
+    if st.button("⬇️ 이전 게시물 더 보기", width='stretch'):
+        st.session_state.feed_fetch_page = True
+        st.rerun()
 
 # 메인 라우팅
 if st.session_state.logged_in:
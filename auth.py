@@ -1,27 +1,41 @@
 import pandas as pd
 import streamlit as st
 from datetime import datetime
+from locking import synchronized, new_lock
+
+# 사용 가능한 프로필 이모지 목록
+PROFILE_EMOJIS = [
+    "😀", "😃", "😄", "😁", "😆", "😅", "🤣", "😂", "🙂", "🙃",
+    "😉", "😊", "😇", "🥰", "😍", "🤩", "😘", "😗", "😚", "😙",
+    "😋", "😛", "😜", "🤪", "😝", "🤑", "🤗", "🤭", "🤫", "🤔",
+    "🤐", "🤨", "😐", "😑", "😶", "😏", "😒", "🙄", "😬", "🤥",
+    "😔", "😪", "🤤", "😴", "😷", "🤒", "🤕", "🤢", "🤮", "🤧",
+    "🥵", "🥶", "🥴", "😵", "🤯", "🤠", "😎", "🤓", "🧐", "😕",
+    "😟", "🙁", "😮", "😯", "😲", "😳", "🥺", "😦", "😧", "😨",
+    "😰", "😥", "😢", "😭", "😱", "😖", "😣", "😞", "😓", "😩",
+    "😫", "🥱", "😤", "😡", "😠", "🤬", "😈", "👿", "💀", "💩",
+    "🤡", "👹", "👺", "👻", "👽", "👾", "🤖", "🎃", "😺", "😸",
+    "😹", "😻", "😼", "😽", "🙀", "😿", "😾", "🐶", "🐱", "🐭",
+    "🐹", "🐰", "🦊", "🐻", "🐼", "🐨", "🐯", "🦁", "🐮", "🐷"
+]
+PROFILE_EMOJI_SET = frozenset(PROFILE_EMOJIS)
+DEFAULT_PROFILE_EMOJI = "😀"
+
+USER_COLUMNS = ['id', 'username', 'password', 'created_at', 'profile_emoji']
 
 class AuthManager:
     def __init__(self, csv_file='users.csv'):
+        self._lock = new_lock()
         self.csv_file = csv_file
-        self.df = self.load_users()
+        self._users_by_name = {}  # username -> 사용자 레코드
+        self._users_by_id = {}  # id -> 사용자 레코드
+        self._max_user_id = 0
+        self._users_frame = None
+        for user in self.load_users().to_dict('records'):
+            self._index_user(user)
         
         # 사용 가능한 프로필 이모지 목록
-        self.profile_emojis = [
-            "😀", "😃", "😄", "😁", "😆", "😅", "🤣", "😂", "🙂", "🙃",
-            "😉", "😊", "😇", "🥰", "😍", "🤩", "😘", "😗", "😚", "😙",
-            "😋", "😛", "😜", "🤪", "😝", "🤑", "🤗", "🤭", "🤫", "🤔",
-            "🤐", "🤨", "😐", "😑", "😶", "😏", "😒", "🙄", "😬", "🤥",
-            "😔", "😪", "🤤", "😴", "😷", "🤒", "🤕", "🤢", "🤮", "🤧",
-            "🥵", "🥶", "🥴", "😵", "🤯", "🤠", "😎", "🤓", "🧐", "😕",
-            "😟", "🙁", "😮", "😯", "😲", "😳", "🥺", "😦", "😧", "😨",
-            "😰", "😥", "😢", "😭", "😱", "😖", "😣", "😞", "😓", "😩",
-            "😫", "🥱", "😤", "😡", "😠", "🤬", "😈", "👿", "💀", "💩",
-            "🤡", "👹", "👺", "👻", "👽", "👾", "🤖", "🎃", "😺", "😸",
-            "😹", "😻", "😼", "😽", "🙀", "😿", "😾", "🐶", "🐱", "🐭",
-            "🐹", "🐰", "🦊", "🐻", "🐼", "🐨", "🐯", "🦁", "🐮", "🐷"
-        ]
+        self.profile_emojis = list(PROFILE_EMOJIS)
     
     def load_users(self):
         """CSV 파일에서 사용자 데이터 로드"""
@@ -34,23 +48,57 @@ class AuthManager:
                 
             return df
         except FileNotFoundError:
-            return pd.DataFrame(columns=['id', 'username', 'password', 'created_at', 'profile_emoji'])
+            return pd.DataFrame(columns=USER_COLUMNS)
+    
+    def _index_user(self, user):
+        """사용자 레코드를 사용자명/ID 인덱스에 추가"""
+        self._users_by_name[user['username']] = user
+        self._users_by_id[user['id']] = user
+        self._max_user_id = max(self._max_user_id, user['id'])
+        self._users_frame = None
+    
+    @property
+    @synchronized
+    def df(self):
+        """전체 사용자 테이블 (변경 시에만 다시 만듦, 다른 세션이 인덱스를 바꾸는 중에는 기다림)"""
+        if self._users_frame is None:
+            self._users_frame = pd.DataFrame(list(self._users_by_id.values()), columns=USER_COLUMNS)
+        return self._users_frame
     
     def save_users(self):
         """사용자 데이터를 CSV 파일에 저장"""
         self.df.to_csv(self.csv_file, index=False)
     
+    def get_user(self, username):
+        """사용자명으로 사용자 정보 조회"""
+        user = self._users_by_name.get(username)
+        return dict(user) if user is not None else None
+    
+    def get_user_by_id(self, user_id):
+        """ID로 사용자 정보 조회"""
+        user = self._users_by_id.get(user_id)
+        return dict(user) if user is not None else None
+    
+    def _insert_user(self, user):
+        """사용자 추가 및 저장"""
+        self._index_user(dict(user))
+        self.save_users()
+    
+    def _update_user(self, username, **fields):
+        """사용자 정보 변경 및 저장"""
+        self._users_by_name[username].update(fields)
+        self._users_frame = None
+        self.save_users()
+    
     def user_exists(self, username):
         """사용자명 중복 체크"""
-        return (self.df["username"] == username).any()
+        return self.get_user(username) is not None
     
     def get_next_id(self):
         """새로운 사용자 ID 생성"""
-        if len(self.df) == 0:
-            return 1
-        else:
-            return self.df['id'].max() + 1
+        return self._max_user_id + 1
     
+    @synchronized
     def register_user(self, username, password):
         """회원가입 처리"""
         if not username or not password:
@@ -67,8 +115,7 @@ class AuthManager:
             'profile_emoji': "😀"  # 기본 프로필 이모지
         }
         
-        self.df = pd.concat([self.df, pd.DataFrame([new_user])], ignore_index=True)
-        self.save_users()
+        self._insert_user(new_user)
         
         return True, "회원가입이 완료되었습니다!"
     
@@ -77,53 +124,73 @@ class AuthManager:
         if not username or not password:
             return False, "사용자명과 비밀번호를 입력하세요"
         
-        if not self.user_exists(username):
+        user = self.get_user(username)
+        if user is None:
             return False, "존재하지 않는 사용자명입니다"
         
-        user_row = self.df[self.df["username"] == username]
-        stored_password = str(user_row["password"].iloc[0])
+        stored_password = str(user["password"])
         
         if password == stored_password:
             return True, f"환영합니다, {username}님!"
         else:
             return False, "비밀번호가 틀렸습니다"
     
+    @synchronized
     def update_profile_emoji(self, username, emoji):
         """사용자 프로필 이모지 업데이트"""
-        if emoji not in self.profile_emojis:
+        if emoji not in PROFILE_EMOJI_SET:
             return False, "유효하지 않은 이모지입니다."
         
         # 사용자 찾기
-        user_idx = self.df[self.df['username'] == username].index
-        if len(user_idx) == 0:
+        if not self.user_exists(username):
             return False, "사용자를 찾을 수 없습니다."
         
         # 프로필 이모지 업데이트
-        self.df.loc[user_idx[0], 'profile_emoji'] = emoji
-        self.save_users()
+        self._update_user(username, profile_emoji=emoji)
         
         return True, "프로필 이모지가 변경되었습니다!"
     
+    @synchronized
+    def update_password(self, username, new_password):
+        """사용자 비밀번호 변경"""
+        if not self.user_exists(username):
+            return False, "사용자를 찾을 수 없습니다."
+        
+        self._update_user(username, password=new_password)
+        
+        return True, "비밀번호가 변경되었습니다!"
+    
     def get_user_profile_emoji(self, username):
         """사용자 프로필 이모지 조회"""
-        user = self.df[self.df['username'] == username]
-        if len(user) > 0:
-            emoji = user['profile_emoji'].iloc[0]
-            return emoji if emoji and emoji in self.profile_emojis else "😀"
-        return "😀"
+        user = self.get_user(username)
+        if user is not None:
+            return self._valid_emoji(user['profile_emoji'])
+        return DEFAULT_PROFILE_EMOJI
+    
+    def get_profile_emojis(self, usernames):
+        """여러 사용자의 프로필 이모지를 한 번에 조회 (username -> 이모지)"""
+        emojis = {}
+        for username in usernames:
+            user = self._users_by_name.get(username)
+            emojis[username] = self._valid_emoji(user['profile_emoji']) if user is not None else DEFAULT_PROFILE_EMOJI
+        return emojis
+    
+    def _valid_emoji(self, emoji):
+        """목록에 없는 이모지는 기본 이모지로 대체"""
+        return emoji if isinstance(emoji, str) and emoji in PROFILE_EMOJI_SET else DEFAULT_PROFILE_EMOJI
     
     def get_user_id(self, username): # 👈 추가
         """사용자명으로 ID 조회"""
-        user = self.df[self.df['username'] == username]
-        if len(user) > 0:
-            return user['id'].iloc[0]
+        user = self.get_user(username)
+        if user is not None:
+            return user['id']
         return None
 
     def get_username_by_id(self, user_id): # 👈 추가
         """ID로 사용자명 조회"""
-        user = self.df[self.df['id'] == user_id]
-        if len(user) > 0:
-            return user['username'].iloc[0]
+        user = self.get_user_by_id(user_id)
+        if user is not None:
+            return user['username']
         return None
 
 def signup_form(auth_manager):
@@ -168,11 +235,11 @@ def auth_page(auth_manager):
     # 로그인/회원가입 전환 버튼
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("로그인", use_container_width=True, key="switch_login"):
+        if st.button("로그인", width='stretch', key="switch_login"):
             st.session_state.show_signup = False
             st.rerun()
     with col2:
-        if st.button("회원가입", use_container_width=True, key="switch_signup"):
+        if st.button("회원가입", width='stretch', key="switch_signup"):
             st.session_state.show_signup = True
             st.rerun()
     
@@ -0,0 +1,80 @@
+# chart_cache.py - 렌더링된 차트 PNG 캐시 (같은 데이터는 한 번만 그림)
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+import matplotlib.pyplot as plt
+import streamlit as st
+
+
+class ChartCache:
+    """차트 데이터 해시 -> PNG 바이트를 최근 사용 순으로 보관하는 LRU 캐시"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(kind, payload):
+        """차트 종류와 데이터로 캐시 키 생성"""
+        raw = json.dumps([kind, payload], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_or_render(self, kind, payload, draw):
+        """캐시된 PNG 반환 (없으면 draw(payload)로 그린 뒤 저장)"""
+        key = self.make_key(kind, payload)
+        with self._lock:
+            png = self._images.get(key)
+            if png is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return png
+
+        png = rasterize(draw(payload))
+        with self._lock:
+            self.misses += 1
+            self._images[key] = png
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return png
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._images.clear()
+
+    def __len__(self):
+        return len(self._images)
+
+
+def rasterize(fig):
+    """Figure를 PNG 바이트로 변환하고 바로 닫기"""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+# 서버 프로세스의 모든 세션이 함께 쓰는 캐시
+chart_cache = ChartCache()
+
+
+def show_chart(kind, payload, draw):
+    """캐시된 차트 이미지 표시 (draw: payload -> matplotlib Figure)"""
+    st.image(chart_cache.get_or_render(kind, payload, draw), width='stretch')
+
+
+def draw_data_chart(content_data):
+    """일반 데이터 막대 차트 Figure 생성"""
+    data = content_data.get('data', {})
+    fig, ax = plt.subplots()
+    ax.bar(list(data.keys()), list(data.values()))
+    ax.set_title(content_data.get('title'))
+    return fig
@@ -3,9 +3,12 @@ import json
 import matplotlib.pyplot as plt
 import streamlit as st
 import os
+from chart_cache import show_chart, draw_data_chart
+from image_pipeline import show_post_image
 
-def display_enhanced_post(post, post_manager, current_username, show_actions=True, auth_manager=None):
-    """개별 게시물 표시 (팩토리 포스트 지원 강화)"""
+def display_enhanced_post(post, post_manager, current_username, show_actions=True, auth_manager=None,
+                          original_posts=None, liked_post_ids=None, profile_emojis=None):
+    """개별 게시물 표시 (팩토리 포스트 지원 강화, original_posts/liked_post_ids/profile_emojis: 피드 단위로 미리 조회한 값)"""
     with st.container():
         # 게시물 정보
         col1, col2, col3 = st.columns([1, 5, 1])
@@ -16,7 +19,8 @@ def display_enhanced_post(post, post_manager, current_username, show_actions=Tru
                 st.markdown("<div style='font-size: 50px; text-align: center;'>🏭</div>", 
                            unsafe_allow_html=True)
             else:
-                display_profile_emoji(auth_manager, post['username'], size=50)
+                emoji = profile_emojis.get(post['username']) if profile_emojis is not None else None
+                display_profile_emoji(auth_manager, post['username'], size=50, emoji=emoji)
         
         with col2:
             # 팩토리 시스템 포스트 특별 표시
@@ -30,7 +34,8 @@ def display_enhanced_post(post, post_manager, current_username, show_actions=Tru
             is_factory_post = False
             is_emergency_post = False
             
-            if isinstance(post['content'], str):
+            # 텍스트/리포스트로 분류된 게시물은 JSON 파싱 생략
+            if isinstance(post['content'], str) and post.get('post_kind') not in ('text', 'repost'):
                 try:
                     content_data = json.loads(post['content'])
                     if content_data and isinstance(content_data, dict):
@@ -55,7 +60,7 @@ def display_enhanced_post(post, post_manager, current_username, show_actions=Tru
             
             # 일반 텍스트 포스트 및 리포스트 처리
             if not is_data_post and not is_factory_post and not is_emergency_post:
-                display_regular_post_content(post, post_manager)
+                display_regular_post_content(post, post_manager, original_posts)
 
         with col3:
             if st.button("📄", key=f"detail_{post['post_id']}", help="게시물 상세보기"):
@@ -65,7 +70,8 @@ def display_enhanced_post(post, post_manager, current_username, show_actions=Tru
         
         # 액션 버튼 (팩토리 시스템 포스트는 제외)
         if show_actions and post['username'] != "🏭_Factory_System":
-            display_post_actions(post, post_manager, current_username)
+            liked = post['post_id'] in liked_post_ids if liked_post_ids is not None else None
+            display_post_actions(post, post_manager, current_username, liked)
         elif post['username'] == "🏭_Factory_System":
             display_factory_post_info(post)
         
@@ -75,14 +81,7 @@ def display_data_chart(content_data):
     """일반 데이터 차트 표시"""
     st.markdown(f"### {content_data.get('title', '데이터 비교')}")
     
-    data = content_data.get('data', {})
-    labels = list(data.keys())
-    values = list(data.values())
-
-    fig, ax = plt.subplots()
-    ax.bar(labels, values)
-    ax.set_title(content_data.get('title'))
-    st.pyplot(fig)
+    show_chart('data', {'title': content_data.get('title'), 'data': content_data.get('data', {})}, draw_data_chart)
 
 def display_factory_status_chart(content_data):
     """팩토리 상태 차트 표시"""
@@ -147,6 +146,10 @@ def display_emergency_alert(content_data):
 
 def display_factory_metrics_chart(data, status):
     """팩토리 메트릭 차트 표시"""
+    show_chart('factory_metrics', data, draw_factory_metrics_chart)
+
+def draw_factory_metrics_chart(data):
+    """팩토리 메트릭 차트 Figure 생성"""
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(10, 8))
     
     # 온도 차트 (위험 수준에 따른 색상)
@@ -182,8 +185,8 @@ def display_factory_metrics_chart(data, status):
     ax4.set_title('생산량 (시간당)')
     ax4.set_ylim(0, 150)
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    fig.tight_layout()
+    return fig
 
 def display_factory_metrics_table(data):
     """팩토리 메트릭 테이블 표시"""
@@ -210,6 +213,11 @@ def display_factory_metrics_table(data):
 
 def display_emergency_data_chart(data, alert_type):
     """긴급 상황 데이터 차트"""
+    show_chart('emergency', {'data': data, 'alert_type': alert_type}, draw_emergency_data_chart)
+
+def draw_emergency_data_chart(payload):
+    """긴급 상황 데이터 차트 Figure 생성"""
+    data, alert_type = payload['data'], payload['alert_type']
     fig, ax = plt.subplots(figsize=(8, 6))
     
     metrics = ['온도', '압력', 'RPM', '생산량']
@@ -236,27 +244,26 @@ def display_emergency_data_chart(data, alert_type):
         ax.text(bar.get_x() + bar.get_width()/2., height + 1,
                 f'{value:.1f}', ha='center', va='bottom', fontweight='bold')
     
-    st.pyplot(fig)
+    return fig
 
-def display_regular_post_content(post, post_manager):
-    """일반 포스트 내용 표시"""
+def display_regular_post_content(post, post_manager, original_posts=None):
+    """일반 포스트 내용 표시 (original_posts: 피드 단위로 미리 조회한 원본 게시물)"""
     if post.get('is_repost') and post.get('original_post_id'):
         if post.get('content'):
             st.write(post['content'])
             st.markdown("---")
         
-        original_post = post_manager.get_post_by_id(post['original_post_id'])
+        if original_posts is not None:
+            original_post = original_posts.get(post['original_post_id'])
+        else:
+            original_post = post_manager.get_post_by_id(post['original_post_id'])
         if original_post:
             st.markdown("🔄 **리포스트된 게시물:**")
             st.markdown(f"**{original_post['username']}** · {original_post['created_at']}")
             st.write(original_post['content'])
             
             if original_post.get('has_image') and original_post.get('image_path'):
-                original_image_path = original_post.get('image_path')
-                if original_image_path and isinstance(original_image_path, str) and os.path.exists(original_image_path):
-                    st.image(original_image_path, width=400)
-                else:
-                    st.write("*이미지를 불러올 수 없습니다.*")
+                show_post_image(post_manager.image_catalog, original_post, 'feed', width=400)
         else:
             st.write("*삭제된 게시물입니다.*")
     else:
@@ -264,27 +271,31 @@ def display_regular_post_content(post, post_manager):
             st.write(post['content'])
 
     if post.get('has_image') and post.get('image_path'):
-        image_path = post.get('image_path')
-        if image_path and isinstance(image_path, str) and os.path.exists(image_path):
-            st.image(image_path, width=400)
-        else:
-            st.write("*이미지를 불러올 수 없습니다.*")
+        show_post_image(post_manager.image_catalog, post, 'feed', width=400)
 
-def display_post_actions(post, post_manager, current_username):
-    """일반 포스트 액션 버튼"""
+@st.fragment
+def display_post_actions(post, post_manager, current_username, liked=None):
+    """일반 포스트 액션 버튼 (liked: 피드 단위로 미리 조회한 좋아요 여부)
+    
+    좋아요/리포스트 버튼은 콜백으로 처리되어 이 카드의 액션 영역만 다시 실행됨
+    """
+    # 조각 재실행 때는 처음 호출 인자가 그대로 들어오므로 이 세션에서 바꾼 게시물은 다시 조회
+    if post['post_id'] in st.session_state.get('touched_posts', set()):
+        post = post_manager.get_post_by_id(post['post_id']) or post
+        liked = None
+    
     col_like, col_repost, col_stats = st.columns([1, 1, 4])
     
     with col_like:
-        liked = post_manager.user_liked_post(post['post_id'], current_username)
+        if liked is None:
+            liked = post_manager.user_liked_post(post['post_id'], current_username)
         like_emoji = "❤️" if liked else "🤍"
-        if st.button(f"{like_emoji} {post['like_count']}", key=f"like_{post['post_id']}"):
-            post_manager.toggle_like(post['post_id'], current_username)
-            st.rerun()
+        st.button(f"{like_emoji} {post['like_count']}", key=f"like_{post['post_id']}",
+                  on_click=toggle_like_clicked, args=(post_manager, post['post_id'], current_username))
     
     with col_repost:
-        if st.button(f"🔄 {post['repost_count']}", key=f"repost_{post['post_id']}"):
-            st.session_state[f"show_repost_{post['post_id']}"] = True
-            st.rerun()
+        st.button(f"🔄 {post['repost_count']}", key=f"repost_{post['post_id']}",
+                  on_click=set_repost_form, args=(post['post_id'], True))
     
     if st.session_state.get(f"show_repost_{post['post_id']}", False):
         with st.expander("리포스트하기", expanded=True):
@@ -297,14 +308,27 @@ def display_post_actions(post, post_manager, current_username):
                     if success:
                         st.success(message)
                         st.session_state[f"show_repost_{post['post_id']}"] = False
+                        # 새 리포스트가 피드에 보여야 하므로 전체 재실행
                         st.rerun()
                     else:
                         st.error(message)
             
             with col_cancel:
-                if st.button("취소", key=f"cancel_repost_{post['post_id']}"):
-                    st.session_state[f"show_repost_{post['post_id']}"] = False
-                    st.rerun()
+                st.button("취소", key=f"cancel_repost_{post['post_id']}",
+                          on_click=set_repost_form, args=(post['post_id'], False))
+
+def toggle_like_clicked(post_manager, post_id, username):
+    """좋아요 버튼 콜백 (카드가 다시 그려지기 전에 반영)"""
+    post_manager.toggle_like(post_id, username)
+    mark_touched('touched_posts', post_id)
+
+def set_repost_form(post_id, show):
+    """리포스트 입력창 열기/닫기 콜백"""
+    st.session_state[f"show_repost_{post_id}"] = show
+
+def mark_touched(state_key, item_id):
+    """이 세션에서 값을 바꾼 항목 기록 (조각 재실행 시 최신 값을 다시 읽는 대상)"""
+    st.session_state.setdefault(state_key, set()).add(item_id)
 
 def display_factory_post_info(post):
     """팩토리 포스트 정보 표시"""
@@ -321,13 +345,89 @@ def display_factory_post_info(post):
     except:
         pass
 
-def display_profile_emoji(auth_manager, username, size=50):
-    """프로필 이모지를 표시하는 공통 함수"""
-    if auth_manager:
-        emoji = auth_manager.get_user_profile_emoji(username)
+def display_profile_emoji(auth_manager, username, size=50, emoji=None):
+    """프로필 이모지를 표시하는 공통 함수 (emoji: 미리 조회한 이모지)"""
+    if emoji is not None or auth_manager:
+        if emoji is None:
+            emoji = auth_manager.get_user_profile_emoji(username)
         st.markdown(
             f"<div style='font-size: {size}px; text-align: center;'>{emoji}</div>",
             unsafe_allow_html=True
         )
     else:
-        st.image("https://via.placeholder.com/50", width=size)
\ No newline at end of file
+        st.image("https://via.placeholder.com/50", width=size)
+# 창 단위 렌더링: 한 번에 온전히 그리는 게시물 수와 자리표시에 쓰는 종류 표시
+FEED_WINDOW_SIZE = 10
+POST_KIND_LABELS = {
+    'text': '📝',
+    'chart': '📊 차트',
+    'factory_status': '🏭 팩토리 상태',
+    'factory_emergency': '🚨 긴급 알림',
+    'repost': '🔄 리포스트',
+}
+
+def display_posts_window(posts, render_post, window_key='feed_window', window_size=FEED_WINDOW_SIZE,
+                         image_catalog=None):
+    """현재 창에 들어온 게시물만 온전히 그리고 나머지는 가벼운 자리표시로 표시
+    
+    render_post(post dict)가 카드 하나를 그림 (차트/이미지/원본 게시물 포함)
+    image_catalog가 주어지면 자리표시에 작은 썸네일 표시
+    """
+    post_list = posts.to_dict('records')
+    last_start = max(len(post_list) - 1, 0) // window_size * window_size
+    start = min(st.session_state.get(window_key, 0), last_start)
+    end = start + window_size
+    
+    if start > 0:
+        st.button(f"⬆️ 이전 {window_size}개 펼쳐 보기", key=f"{window_key}_prev", width='stretch',
+                  on_click=set_window, args=(window_key, start - window_size))
+    
+    for index, post in enumerate(post_list):
+        if start <= index < end:
+            render_post(post)
+        else:
+            display_post_placeholder(post, render_post, image_catalog)
+    
+    if end < len(post_list):
+        st.button(f"⬇️ 다음 {window_size}개 펼쳐 보기", key=f"{window_key}_next", width='stretch',
+                  on_click=set_window, args=(window_key, end))
+
+def set_window(window_key, start):
+    """창 이동 버튼 콜백"""
+    st.session_state[window_key] = start
+
+@st.fragment
+def display_post_placeholder(post, render_post, image_catalog=None):
+    """창 밖 게시물의 한 줄 요약 (펼치면 이 카드만 다시 그림)"""
+    post_id = post['post_id']
+    if post_id in st.session_state.get('expanded_posts', set()):
+        render_post(post)
+        st.button("접기", key=f"collapse_{post_id}", on_click=set_post_expanded, args=(post_id, False))
+        return
+    
+    col_thumb, col_info, col_open = st.columns([1, 6, 1])
+    with col_thumb:
+        thumb_path = None
+        if image_catalog is not None and post.get('has_image') and post.get('image_status') != 'pending':
+            thumb_path = image_catalog.variant_path(post.get('image_path'), 'tiny')
+        if thumb_path:
+            st.image(thumb_path, width=48)
+    with col_info:
+        author = "🏭 Factory System" if post['username'] == "🏭_Factory_System" else post['username']
+        kind = post.get('post_kind')
+        summary = POST_KIND_LABELS.get(kind, '📝')
+        # 텍스트 게시물만 내용 앞부분 표시 (차트/팩토리 JSON은 파싱하지 않음)
+        if kind in ('text', 'repost') and isinstance(post.get('content'), str):
+            preview = post['content'][:60]
+            summary += f" {preview}…" if len(post['content']) > 60 else f" {preview}"
+        st.caption(f"**{author}** · {post['created_at']} · {summary}")
+    with col_open:
+        st.button("펼치기", key=f"expand_{post_id}", on_click=set_post_expanded, args=(post_id, True))
+
+def set_post_expanded(post_id, expanded):
+    """자리표시 카드 펼치기/접기 콜백"""
+    expanded_posts = st.session_state.setdefault('expanded_posts', set())
+    if expanded:
+        expanded_posts.add(post_id)
+    else:
+        expanded_posts.discard(post_id)
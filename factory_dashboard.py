@@ -1,7 +1,25 @@
 # factory_dashboard.py - 팩토리 대시보드 페이지
 import streamlit as st
 import json
+import pandas as pd
+import matplotlib.pyplot as plt
+from datetime import datetime, timedelta
 from factory_integration import integrate_factory_with_social_feed
+from chart_cache import show_chart
+
+# 상세 페이지 센서 추이 기간(None은 전체)과 지표
+HISTORY_WINDOWS = {
+    '최근 1시간': timedelta(hours=1),
+    '최근 24시간': timedelta(days=1),
+    '최근 7일': timedelta(days=7),
+    '전체': None,
+}
+HISTORY_METRICS = {
+    '온도 (°C)': 'temperature',
+    '압력 (bar)': 'pressure',
+    'RPM': 'rpm',
+    '생산량 (/h)': 'product_count',
+}
 
 def factory_dashboard_page(factory_manager, post_manager):
     """팩토리 대시보드 페이지"""
@@ -20,6 +38,14 @@ def factory_dashboard_page(factory_manager, post_manager):
     with col4:
         st.metric("위험", summary['error_count'], delta=None, delta_color="inverse")
     
+    if summary['locations']:
+        with st.expander("📍 위치별 현황", expanded=False):
+            st.dataframe(
+                pd.DataFrame.from_dict(summary['locations'], orient='index')
+                .rename(columns={'normal': '정상', 'warning': '경고', 'error': '위험'}),
+                width='stretch'
+            )
+    
     st.write("---")
     
     # 팩토리 관리 섹션
@@ -45,7 +71,7 @@ def factory_dashboard_page(factory_manager, post_manager):
         st.write("등록된 팩토리가 없습니다. 새 팩토리를 추가해보세요!")
         return
     
-    for factory_status in summary['factories']:
+    for factory_status in factory_manager.iter_factory_statuses():
         display_factory_card(factory_status, factory_manager)
     
     st.write("---")
@@ -210,41 +236,32 @@ def factory_detail_page(factory_manager):
     # 기준값 대비 분석
     st.subheader("📈 성능 분석")
     
-    import matplotlib.pyplot as plt
-    import numpy as np
-    
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
+    show_chart('performance', {
+        'base': [factory.base_temp, factory.base_pressure, factory.base_rpm, factory.base_product],
+        'current': [status['temperature'], status['pressure'], status['rpm'], status['product_count']],
+    }, draw_performance_chart)
     
-    # 온도 분석
-    temp_data = [factory.base_temp, status['temperature']]
-    temp_colors = ['blue', 'red' if status['temperature'] > factory.base_temp + 20 else 'green']
-    ax1.bar(['기준값', '현재값'], temp_data, color=temp_colors)
-    ax1.set_title('온도 비교 (°C)')
-    ax1.set_ylabel('온도')
-    
-    # 압력 분석
-    pressure_data = [factory.base_pressure, status['pressure']]
-    pressure_colors = ['blue', 'orange' if status['pressure'] < factory.base_pressure - 20 else 'green']
-    ax2.bar(['기준값', '현재값'], pressure_data, color=pressure_colors)
-    ax2.set_title('압력 비교 (bar)')
-    ax2.set_ylabel('압력')
-    
-    # RPM 분석
-    rpm_data = [factory.base_rpm, status['rpm']]
-    rpm_colors = ['blue', 'purple' if status['rpm'] < factory.base_rpm - 10 else 'green']
-    ax3.bar(['기준값', '현재값'], rpm_data, color=rpm_colors)
-    ax3.set_title('RPM 비교')
-    ax3.set_ylabel('RPM')
-    
-    # 생산량 분석
-    prod_data = [factory.base_product, status['product_count']]
-    prod_colors = ['blue', 'darkgreen']
-    ax4.bar(['기준값', '현재값'], prod_data, color=prod_colors)
-    ax4.set_title('생산량 비교 (시간당)')
-    ax4.set_ylabel('생산량')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    # 센서 기록 추이
+    st.write("---")
+    st.subheader("📉 센서 추이")
+    
+    col_window, col_metric = st.columns(2)
+    with col_window:
+        window_label = st.selectbox("기간", list(HISTORY_WINDOWS.keys()), key="history_window")
+    with col_metric:
+        metric_label = st.selectbox("지표", list(HISTORY_METRICS.keys()), key="history_metric")
+    
+    window = HISTORY_WINDOWS[window_label]
+    start = datetime.now() - window if window else None
+    metric = HISTORY_METRICS[metric_label]
+    # 미리 계산된 1분/1시간/1일 집계에서 기간에 맞는 해상도를 골라 최대 300개 점으로 표시
+    trend = factory_manager.get_factory_trend(factory_id, metric, start=start)
+    if trend.empty:
+        st.info("선택한 기간의 센서 기록이 없습니다.")
+    else:
+        st.line_chart(trend.set_index('timestamp')[['min', 'mean', 'max']], y_label=metric_label)
+        st.caption(f"{len(trend)}개 구간 (최소/평균/최대) · {trend['timestamp'].iloc[0]:%Y-%m-%d %H:%M} ~ "
+                   f"{trend['timestamp'].iloc[-1]:%Y-%m-%d %H:%M}")
     
     # 권장 조치사항
     st.write("---")
@@ -274,4 +291,37 @@ def factory_detail_page(factory_manager):
         for rec in recommendations:
             st.write(rec)
     else:
-        st.write("✅ 현재 특별한 조치사항이 없습니다.")
\ No newline at end of file
+        st.write("✅ 현재 특별한 조치사항이 없습니다.")
+
+def draw_performance_chart(payload):
+    """기준값 대비 현재값 비교 차트 Figure 생성"""
+    base_temp, base_pressure, base_rpm, base_product = payload['base']
+    temp, pressure, rpm, product = payload['current']
+    
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
+    
+    # 온도 분석
+    temp_colors = ['blue', 'red' if temp > base_temp + 20 else 'green']
+    ax1.bar(['기준값', '현재값'], [base_temp, temp], color=temp_colors)
+    ax1.set_title('온도 비교 (°C)')
+    ax1.set_ylabel('온도')
+    
+    # 압력 분석
+    pressure_colors = ['blue', 'orange' if pressure < base_pressure - 20 else 'green']
+    ax2.bar(['기준값', '현재값'], [base_pressure, pressure], color=pressure_colors)
+    ax2.set_title('압력 비교 (bar)')
+    ax2.set_ylabel('압력')
+    
+    # RPM 분석
+    rpm_colors = ['blue', 'purple' if rpm < base_rpm - 10 else 'green']
+    ax3.bar(['기준값', '현재값'], [base_rpm, rpm], color=rpm_colors)
+    ax3.set_title('RPM 비교')
+    ax3.set_ylabel('RPM')
+    
+    # 생산량 분석
+    ax4.bar(['기준값', '현재값'], [base_product, product], color=['blue', 'darkgreen'])
+    ax4.set_title('생산량 비교 (시간당)')
+    ax4.set_ylabel('생산량')
+    
+    fig.tight_layout()
+    return fig
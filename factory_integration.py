@@ -7,6 +7,7 @@ def integrate_factory_with_social_feed(post_manager, factory_manager):
     
     # 팩토리 포스트를 일반 포스트 형식으로 변환
     factory_posts = factory_manager.get_factory_feed(1)
+    posts = post_manager.get_all_posts()
     
     for _, factory_post in factory_posts.iterrows():
         # 시스템 사용자로 포스트 생성
@@ -33,14 +34,14 @@ def integrate_factory_with_social_feed(post_manager, factory_manager):
                     "factory_id": factory_post['factory_id'],
                     "priority": factory_post['priority']
                 }
-                content = json.dumps(chart_data)
+                content = json.dumps(chart_data, default=str)
             except (json.JSONDecodeError, KeyError, TypeError):
                 pass
         
         # 중복 포스트 방지를 위한 체크
-        existing_posts = post_manager.posts_df[
-            (post_manager.posts_df['username'] == system_username) &
-            (post_manager.posts_df['created_at'] == factory_post['created_at'])
+        existing_posts = posts[
+            (posts['username'] == system_username) &
+            (posts['created_at'] == factory_post['created_at'])
         ]
         
         if len(existing_posts) == 0:
@@ -71,7 +72,7 @@ def create_factory_status_post(factory_manager, factory_id, post_manager):
         "priority": "high" if status['status'] != "normal" else "normal"
     }
     
-    content = json.dumps(chart_data)
+    content = json.dumps(chart_data, default=str)
     success, message = post_manager.create_post(system_username, content)
     
     return success, message
@@ -79,9 +80,7 @@ def create_factory_status_post(factory_manager, factory_id, post_manager):
 def get_factory_posts_from_social_feed(post_manager):
     """소셜 피드에서 팩토리 관련 포스트만 필터링"""
     system_username = "🏭_Factory_System"
-    factory_posts = post_manager.posts_df[
-        post_manager.posts_df['username'] == system_username
-    ].sort_values('created_at', ascending=False)
+    factory_posts = post_manager.get_user_posts(system_username)
     
     return factory_posts
 
@@ -151,61 +150,37 @@ def create_emergency_alert_post(factory_manager, factory_id, post_manager, alert
             "factory_id": factory_id,
             "priority": "emergency"
         }
-        content = json.dumps(chart_data)
+        content = json.dumps(chart_data, default=str)
     else:
         content = alert_content
     
     success, message = post_manager.create_post(system_username, content)
     return success, message
 
-def schedule_factory_monitoring(factory_manager, post_manager, monitoring_interval=300):
-    """팩토리 모니터링 스케줄링 (초 단위)"""
-    import threading
-    import time
+def post_status_changes(factory_manager, post_manager, old_statuses, new_statuses):
+    """상태가 바뀐 팩토리를 소셜 피드에 알림 (old/new_statuses: factory_id -> 상태 이름)"""
+    for factory_id, new_status in new_statuses.items():
+        if new_status == old_statuses.get(factory_id):
+            continue
+        if new_status != 'normal':
+            # 비정상 상태면 긴급 알림
+            create_emergency_alert_post(factory_manager, factory_id, post_manager, new_status)
+        else:
+            # 정상으로 복구되면 일반 상태 포스트
+            create_factory_status_post(factory_manager, factory_id, post_manager)
+
+def schedule_factory_monitoring(factory_manager, post_manager, monitoring_interval=300, workers=None, **options):
+    """팩토리 모니터링 스케줄링 (초 단위, 팩토리마다 주기에 맞춰 점검하는 스케줄러를 시작해서 반환)
     
-    def monitor_factories():
-        while True:
-            try:
-                # 모든 팩토리 상태 체크
-                for factory_id in factory_manager.factories.keys():
-                    factory = factory_manager.get_factory_by_id(factory_id)
-                    if factory:
-                        old_status = factory.status
-                        
-                        # 상태 업데이트
-                        new_status_data = factory_manager.update_factory_status(factory_id)
-                        
-                        # 상태 변화가 있으면 소셜 피드에 포스트
-                        if new_status_data and new_status_data['status'] != old_status:
-                            if new_status_data['status'] != 'normal':
-                                # 비정상 상태면 긴급 알림
-                                create_emergency_alert_post(
-                                    factory_manager, factory_id, post_manager, 
-                                    new_status_data['status']
-                                )
-                            else:
-                                # 정상으로 복구되면 일반 상태 포스트
-                                create_factory_status_post(
-                                    factory_manager, factory_id, post_manager
-                                )
-                
-                # 전체 요약도 주기적으로 포스트 (1시간마다)
-                current_time = time.time()
-                if hasattr(monitor_factories, 'last_summary_time'):
-                    if current_time - monitor_factories.last_summary_time > 3600:  # 1시간
-                        create_factory_summary_post(factory_manager, post_manager)
-                        monitor_factories.last_summary_time = current_time
-                else:
-                    monitor_factories.last_summary_time = current_time
-                
-                time.sleep(monitoring_interval)
-                
-            except Exception as e:
-                print(f"모니터링 오류: {e}")
-                time.sleep(60)  # 오류 시 1분 대기
-    
-    # 백그라운드 스레드로 실행
-    monitor_thread = threading.Thread(target=monitor_factories, daemon=True)
-    monitor_thread.start()
-    
-    return monitor_thread
\ No newline at end of file
+    workers를 주면 팩토리를 워커 프로세스에 나눠 monitoring_interval마다 한꺼번에 갱신하는 샤드 모드로 실행
+    """
+    if workers:
+        from sharded_monitor import ShardedFleetMonitor
+        return ShardedFleetMonitor(factory_manager, post_manager, workers=workers, **options).start(monitoring_interval)
+    
+    from scheduler import FactoryScheduler
+    
+    scheduler = FactoryScheduler(factory_manager, post_manager, poll_interval=monitoring_interval, **options)
+    scheduler.start()
+    
+    return scheduler
@@ -5,15 +5,29 @@ from datetime import datetime, timedelta
 import random
 import json
 import streamlit as st
-from sim_factory import Sim_Factory
+from sim_factory import Sim_Factory, status_message
+from fleet import FactoryFleet, STATUSES, NORMAL, OVERHEAT, LOW_PRESSURE, RPM_ISSUE
+from telemetry import TelemetryStore
+from locking import synchronized, new_lock
+from timeline import Timeline
+
+# 다른 프로세스와 주고받는 fleet 배열 이름
+FLEET_VALUES = ('temp', 'pressure', 'rpm', 'count', 'status')
 
 class FactoryManager:
-    def __init__(self, factories_file='factories.csv', factory_posts_file='factory_posts.csv'):
+    def __init__(self, factories_file='factories.csv', factory_posts_file='factory_posts.csv',
+                 telemetry_file='telemetry.bin'):
+        self._lock = new_lock()
         self.factories_file = factories_file
         self.factory_posts_file = factory_posts_file
         self.factories_df = self.load_factories()
         self.factory_posts_df = self.load_factory_posts()
-        self.factories = {}
+        self._feed_timeline = Timeline()  # factory_posts_df 행 라벨 (작성 시각 순)
+        self._index_factory_posts()
+        self.fleet = FactoryFleet()  # 모든 팩토리의 센서 값 배열
+        self.factories = {}  # factory_id -> fleet 행을 보여주는 Sim_Factory
+        self.telemetry = TelemetryStore(telemetry_file)  # 팩토리별 센서 값 기록
+        self._snapshot = None  # 사이드바 등이 함께 읽는 요약 스냅샷 (상태가 바뀌면 다시 만듦)
         
         # 기존 팩토리 인스턴스 생성
         self.initialize_factories()
@@ -47,31 +61,85 @@ class FactoryManager:
         """팩토리 포스트 저장"""
         self.factory_posts_df.to_csv(self.factory_posts_file, index=False)
     
+    def _insert_factory(self, factory_row):
+        """팩토리 행 추가 및 저장"""
+        self.factories_df = pd.concat([self.factories_df, pd.DataFrame([factory_row])], ignore_index=True)
+        self.save_factories()
+    
+    def _update_factory_row(self, factory_id, values):
+        """팩토리 행의 마지막 상태 값 변경 및 저장"""
+        factory_idx = self.factories_df[self.factories_df['factory_id'] == factory_id].index
+        if len(factory_idx) > 0:
+            for column, value in values.items():
+                self.factories_df.loc[factory_idx[0], column] = value
+            self.save_factories()
+    
+    def _update_factory_rows(self, factory_ids, values):
+        """여러 팩토리 행의 마지막 상태 값을 한 번에 변경하고 한 번만 저장 (values: 컬럼 -> 팩토리 순서의 값 목록)"""
+        positions = pd.Index(self.factories_df['factory_id']).get_indexer(factory_ids)
+        found = positions >= 0
+        labels = self.factories_df.index[positions[found]]
+        for column, column_values in values.items():
+            self.factories_df.loc[labels, column] = np.asarray(column_values)[found]
+        self.save_factories()
+    
+    def _record_telemetry(self, factory_ids, timestamp):
+        """팩토리들의 현재 센서 값을 기록 저장소에 추가"""
+        rows = [self.factories[factory_id].row for factory_id in factory_ids]
+        self.telemetry.record_batch(factory_ids, timestamp, {
+            'temperature': self.fleet.temp[rows],
+            'pressure': self.fleet.pressure[rows],
+            'rpm': self.fleet.rpm[rows],
+            'product_count': self.fleet.count[rows]
+        })
+    
+    def _index_factory_posts(self):
+        """팩토리 포스트를 작성 시각 순 타임라인에 등록"""
+        for label, created_at in zip(self.factory_posts_df.index, self.factory_posts_df['created_at']):
+            self._feed_timeline.add(created_at, label)
+    
+    def get_next_factory_post_id(self):
+        """새로운 팩토리 포스트 ID 생성"""
+        return len(self.factory_posts_df) + 1
+    
+    def _insert_factory_post(self, post):
+        """팩토리 포스트 추가 및 저장"""
+        self.factory_posts_df = pd.concat([self.factory_posts_df, pd.DataFrame([post])], ignore_index=True)
+        self._feed_timeline.add(post['created_at'], len(self.factory_posts_df) - 1)
+        self.save_factory_posts()
+    
+    def _insert_factory_posts(self, posts):
+        """여러 팩토리 포스트를 한 번에 추가하고 한 번만 저장"""
+        start = len(self.factory_posts_df)
+        self.factory_posts_df = pd.concat([self.factory_posts_df, pd.DataFrame(posts)], ignore_index=True)
+        for label, post in enumerate(posts, start=start):
+            self._feed_timeline.add(post['created_at'], label)
+        self.save_factory_posts()
+    
     def initialize_factories(self):
-        """저장된 팩토리들을 인스턴스로 초기화"""
-        for _, factory_data in self.factories_df.iterrows():
-            factory = Sim_Factory(factory_data['factory_name'])
-            factory.factory_id = factory_data['factory_id']
-            factory.location = factory_data['location']
+        """저장된 팩토리들을 fleet 행으로 초기화"""
+        df = self.factories_df
+        for factory_id, name, location, temp, pressure, rpm, count, status in zip(
+                df['factory_id'], df['factory_name'], df['location'], df['last_temp'],
+                df['last_pressure'], df['last_rpm'], df['last_product_count'], df['last_status']):
+            # 마지막 상태 복원 (기록이 없으면 기본 값)
+            if pd.notna(temp):
+                row = self.fleet.add(temp, pressure, rpm, count, status, location=location)
+            else:
+                row = self.fleet.add(location=location)
             
-            # 마지막 상태 복원
-            if pd.notna(factory_data['last_temp']):
-                factory.temp = factory_data['last_temp']
-                factory.pressure = factory_data['last_pressure']
-                factory.rpm = factory_data['last_rpm']
-                factory.count = factory_data['last_product_count']
-                factory.status = factory_data['last_status']
-            
-            self.factories[factory_data['factory_id']] = factory
+            factory = Sim_Factory(name, self.fleet, row)
+            factory.factory_id = factory_id
+            self.factories[factory_id] = factory
     
+    @synchronized
     def add_factory(self, factory_name, location):
         """새 팩토리 추가"""
         factory_id = f"factory_{len(self.factories_df) + 1:03d}"
         
-        # 새 팩토리 인스턴스 생성
-        factory = Sim_Factory(factory_name)
+        # 새 팩토리 행 추가
+        factory = Sim_Factory(factory_name, self.fleet, self.fleet.add(location=location))
         factory.factory_id = factory_id
-        factory.location = location
         factory.generate_normal_data()
         
         # 데이터프레임에 추가
@@ -88,15 +156,17 @@ class FactoryManager:
             'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        self.factories_df = pd.concat([self.factories_df, pd.DataFrame([new_factory])], ignore_index=True)
         self.factories[factory_id] = factory
-        self.save_factories()
+        self._insert_factory(new_factory)
+        self._record_telemetry([factory_id], new_factory['created_at'])
+        self._snapshot = None
         
         # 팩토리 생성 포스트 추가
         self.create_factory_post(factory_id, f"🏭 새로운 팩토리 '{factory_name}'가 {location}에 설립되었습니다!", "normal")
         
         return factory_id
     
+    @synchronized
     def update_factory_status(self, factory_id, force_abnormal=False):
         """팩토리 상태 업데이트"""
         if factory_id not in self.factories:
@@ -111,15 +181,17 @@ class FactoryManager:
             factory.generate_normal_data()
         
         # 데이터프레임 업데이트
-        factory_idx = self.factories_df[self.factories_df['factory_id'] == factory_id].index
-        if len(factory_idx) > 0:
-            self.factories_df.loc[factory_idx[0], 'last_temp'] = factory.temp
-            self.factories_df.loc[factory_idx[0], 'last_pressure'] = factory.pressure
-            self.factories_df.loc[factory_idx[0], 'last_rpm'] = factory.rpm
-            self.factories_df.loc[factory_idx[0], 'last_product_count'] = factory.count
-            self.factories_df.loc[factory_idx[0], 'last_status'] = factory.status
-            self.factories_df.loc[factory_idx[0], 'last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_factories()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._update_factory_row(factory_id, {
+            'last_temp': factory.temp,
+            'last_pressure': factory.pressure,
+            'last_rpm': factory.rpm,
+            'last_product_count': factory.count,
+            'last_status': factory.status,
+            'last_update': now
+        })
+        self._record_telemetry([factory_id], now)
+        self._snapshot = None
         
         # 상태 변화시 포스트 생성
         status = factory.current_status()
@@ -130,35 +202,123 @@ class FactoryManager:
         
         return status
     
-    def generate_status_message(self, factory):
-        """상태에 따른 메시지 생성"""
-        status_emojis = {
-            'normal': '✅',
-            'overheat': '🔥',
-            'low_pressure': '⚠️',
-            'rpm_issue': '⚙️'
-        }
+    @synchronized
+    def update_all_factories(self, abnormal_rate=0.15):
+        """모든 팩토리 상태를 한 번에 갱신하고 상태 포스트를 일괄 저장 (factory_id -> 새 상태)"""
+        # ID 목록을 읽는 것부터 같은 잠금 안에서 해야 다른 세션의 add_factory와 섞이지 않음
+        return self.update_factories(self.get_factory_ids(), abnormal_rate)
+    
+    @synchronized
+    def update_factories(self, factory_ids, abnormal_rate=0.15):
+        """지정한 팩토리들의 상태를 한 번에 갱신하고 상태 포스트를 일괄 저장 (없는 ID는 건너뜀)"""
+        factory_ids = [factory_id for factory_id in factory_ids if factory_id in self.factories]
+        if not factory_ids:
+            return {}
         
-        emoji = status_emojis.get(factory.status, '❓')
+        rows = np.array([self.factories[factory_id].row for factory_id in factory_ids])
         
-        if factory.status == 'normal':
-            return f"{emoji} {factory.name} 정상 운영 중 (온도: {factory.temp:.1f}°C, 압력: {factory.pressure:.1f}bar)"
-        elif factory.status == 'overheat':
-            return f"{emoji} {factory.name} 과열 경고! 온도가 {factory.temp:.1f}°C로 상승했습니다"
-        elif factory.status == 'low_pressure':
-            return f"{emoji} {factory.name} 압력 부족! 현재 압력: {factory.pressure:.1f}bar"
-        elif factory.status == 'rpm_issue':
-            return f"{emoji} {factory.name} 속도 문제 발생! 현재 RPM: {factory.rpm:.1f}"
-        else:
-            return f"{emoji} {factory.name} 상태 점검 필요"
+        # 대상 팩토리를 fleet 배열에서 한 번에 진행
+        self.fleet.step(rows, abnormal_rate)
+        
+        statuses = {}
+        messages = []
+        status_data = []
+        for factory_id in factory_ids:
+            factory = self.factories[factory_id]
+            status = factory.current_status()
+            statuses[factory_id] = status
+            messages.append(self.generate_status_message(factory))
+            status_data.append(json.dumps(status, default=str))
+        self._commit_factory_updates(factory_ids, rows, messages, status_data)
+        
+        return statuses
+    
+    @synchronized
+    def update_factory_transitions(self, factory_ids, abnormal_rate=0.15):
+        """update_factories와 같지만 갱신 직전 상태도 같은 잠금 안에서 읽어 (이전 상태 이름, 새 상태) 반환"""
+        old_statuses = {factory_id: self.factories[factory_id].status
+                        for factory_id in factory_ids if factory_id in self.factories}
+        return old_statuses, self.update_factories(factory_ids, abnormal_rate)
     
+    @synchronized
+    def get_factory_values(self, factory_ids):
+        """팩토리들의 현재 센서 값/상태 코드 ('temp'/'pressure'/'rpm'/'count'/'status' -> factory_ids 순서의 배열)"""
+        rows = np.array([self.factories[factory_id].row for factory_id in factory_ids], dtype=np.intp)
+        return {name: getattr(self.fleet, name)[rows] for name in FLEET_VALUES}
+    
+    @synchronized
+    def apply_factory_results(self, factory_ids, values, messages, status_data, expected=None):
+        """다른 프로세스에서 계산한 센서 값/상태 코드/메시지를 반영하고 상태 포스트를 일괄 저장
+        
+        values: get_factory_values와 같은 형식의 새 값 (없는 ID는 건너뜀)
+        expected: 계산에 쓴 값 - 그 뒤 이 프로세스에서 바뀐 팩토리(수동 갱신 등)는 덮어쓰지 않음
+        반환: (factory_id -> 이전 상태 이름, factory_id -> 새 상태 이름) - 반영한 팩토리만
+        """
+        keep = np.array([i for i, factory_id in enumerate(factory_ids) if factory_id in self.factories],
+                        dtype=np.intp)
+        rows = np.array([self.factories[factory_ids[i]].row for i in keep], dtype=np.intp)
+        if expected is not None and len(keep):
+            unchanged = np.ones(len(keep), dtype=bool)
+            for name in FLEET_VALUES:
+                unchanged &= getattr(self.fleet, name)[rows] == np.asarray(expected[name])[keep]
+            keep = keep[unchanged]
+            rows = rows[unchanged]
+        if not len(keep):
+            return {}, {}
+        
+        factory_ids = [factory_ids[i] for i in keep]
+        old_statuses = {factory_id: STATUSES[code] for factory_id, code in zip(factory_ids, self.fleet.status[rows])}
+        for name in ('temp', 'pressure', 'rpm', 'count'):
+            getattr(self.fleet, name)[rows] = np.asarray(values[name])[keep]
+        self.fleet.set_status(rows, np.asarray(values['status'])[keep])
+        
+        self._commit_factory_updates(factory_ids, rows, [messages[i] for i in keep], [status_data[i] for i in keep])
+        
+        new_statuses = {factory_id: STATUSES[code] for factory_id, code in zip(factory_ids, self.fleet.status[rows])}
+        return old_statuses, new_statuses
+    
+    def _commit_factory_updates(self, factory_ids, rows, messages, status_data):
+        """갱신된 fleet 행을 팩토리 행/센서 기록에 반영하고 상태 포스트를 한 번에 저장"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._update_factory_rows(factory_ids, {
+            'last_temp': self.fleet.temp[rows],
+            'last_pressure': self.fleet.pressure[rows],
+            'last_rpm': self.fleet.rpm[rows],
+            'last_product_count': self.fleet.count[rows],
+            'last_status': [STATUSES[code] for code in self.fleet.status[rows]],
+            'last_update': [now] * len(rows)
+        })
+        self._record_telemetry(factory_ids, now)
+        self._snapshot = None
+        
+        # 팩토리마다 상태 포스트를 만들어 한 번에 저장
+        next_post_id = self.get_next_factory_post_id()
+        self._insert_factory_posts([
+            {
+                'post_id': next_post_id + offset,
+                'factory_id': factory_id,
+                'factory_name': self.factories[factory_id].name,
+                'message': message,
+                'status_data': data,
+                'priority': "high" if code != NORMAL else "normal",
+                'created_at': now
+            }
+            for offset, (factory_id, code, message, data) in enumerate(
+                zip(factory_ids, self.fleet.status[rows], messages, status_data))
+        ])
+    
+    def generate_status_message(self, factory):
+        """상태에 따른 메시지 생성"""
+        return status_message(factory)
+    
+    @synchronized
     def create_factory_post(self, factory_id, message, priority="normal", status_data=None):
         """팩토리 포스트 생성"""
         factory = self.factories.get(factory_id)
         if not factory:
             return
         
-        post_id = len(self.factory_posts_df) + 1
+        post_id = self.get_next_factory_post_id()
         
         new_post = {
             'post_id': post_id,
@@ -170,30 +330,65 @@ class FactoryManager:
             'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        self.factory_posts_df = pd.concat([self.factory_posts_df, pd.DataFrame([new_post])], ignore_index=True)
-        self.save_factory_posts()
+        self._insert_factory_post(new_post)
         
         return post_id
     
     def get_factory_feed(self, limit=10):
         """팩토리 피드 조회"""
-        return self.factory_posts_df.sort_values('created_at', ascending=False).head(limit)
+        return self.factory_posts_df.loc[self._feed_timeline.latest(limit)]
     
     def get_factory_summary(self):
-        """팩토리 요약 정보"""
-        total_factories = len(self.factories)
-        normal_count = sum(1 for f in self.factories.values() if f.status == 'normal')
-        warning_count = sum(1 for f in self.factories.values() if f.status in ['low_pressure', 'rpm_issue'])
-        error_count = sum(1 for f in self.factories.values() if f.status == 'overheat')
+        """팩토리 요약 정보 (상태가 바뀔 때 갱신되는 집계를 읽기만 함)"""
+        counts = self.fleet.status_counts
         
         return {
-            'total_factories': total_factories,
-            'normal_count': normal_count,
-            'warning_count': warning_count,
-            'error_count': error_count,
-            'factories': [f.current_status() for f in self.factories.values()]
+            'total_factories': len(self.factories),
+            'normal_count': int(counts[NORMAL]),
+            'warning_count': int(counts[LOW_PRESSURE] + counts[RPM_ISSUE]),
+            'error_count': int(counts[OVERHEAT]),
+            'locations': self.fleet.location_summary()
         }
     
+    @synchronized
+    def get_fleet_snapshot(self):
+        """여러 세션이 함께 읽는 팩토리 요약 스냅샷 (updated_at: 스냅샷을 만든 시각)
+        
+        상태가 바뀐 뒤 처음 읽을 때만 다시 만들고, 그 전까지는 같은 dict를 돌려줌
+        """
+        if self._snapshot is None:
+            snapshot = self.get_factory_summary()
+            snapshot['updated_at'] = datetime.now()
+            self._snapshot = snapshot
+        return self._snapshot
+    
+    @synchronized
+    def get_factory_ids(self):
+        """등록된 팩토리 ID 목록 (매니저 잠금 안에서 복사하므로 다른 스레드가 팩토리를 추가하는 중에도 안전)"""
+        return list(self.factories)
+    
+    @synchronized
+    def _factory_items(self):
+        return list(self.factories.items())
+    
+    def iter_factory_statuses(self):
+        """팩토리별 현재 상태를 하나씩 생성 (목록을 그리는 화면에서만 사용)
+        
+        화면을 그리는 동안 다른 세션이 팩토리를 추가할 수 있으므로 잠금 안에서 복사한 목록을 순회
+        """
+        for factory_id, factory in self._factory_items():
+            status = factory.current_status()
+            status['factory_id'] = factory_id
+            yield status
+    
+    def get_factory_history(self, factory_id, start=None, end=None):
+        """팩토리 센서 기록 조회 (timestamp와 지표별 컬럼의 DataFrame)"""
+        return self.telemetry.history(factory_id, start, end)
+    
+    def get_factory_trend(self, factory_id, metric, start=None, end=None, max_points=300):
+        """차트용 센서 추이 (구간 집계의 최소/평균/최대, 최대 max_points개 점)"""
+        return self.telemetry.trend(factory_id, metric, start, end, max_points)
+    
     def get_factory_by_id(self, factory_id):
         """팩토리 ID로 조회"""
         return self.factories.get(factory_id)
\ No newline at end of file
@@ -0,0 +1,142 @@
+# fleet.py - 팩토리 전체의 센서 값을 NumPy 배열로 보관하는 시뮬레이터
+import numpy as np
+
+# 상태 코드 (status 배열에는 이 튜플의 인덱스를 저장)
+STATUSES = ('normal', 'overheat', 'low_pressure', 'rpm_issue')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+NORMAL, OVERHEAT, LOW_PRESSURE, RPM_ISSUE = range(len(STATUSES))
+
+# 기본 운영 값
+BASE_TEMP = 180  # 기본 온도 (°C)
+BASE_PRESSURE = 150  # 기본 압력 (bar)
+BASE_RPM = 50  # 기본 속도 (rpm)
+BASE_PRODUCT = 100  # 시간당 생산량
+
+
+class FactoryFleet:
+    """팩토리마다 한 행씩 온도/압력/속도/생산량/상태 배열을 두고 전체를 한 번에 갱신"""
+
+    def __init__(self, capacity=64, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.size = 0
+        self.temp = np.empty(capacity)
+        self.pressure = np.empty(capacity)
+        self.rpm = np.empty(capacity)
+        self.count = np.empty(capacity)
+        self.status = np.empty(capacity, dtype=np.int8)
+        self.location = np.empty(capacity, dtype=np.intp)  # locations 목록의 인덱스
+        self.locations = []  # 위치 이름 (처음 나온 순서)
+        self._location_codes = {}
+        # 상태가 바뀔 때마다 갱신하는 위치 x 상태별 팩토리 수
+        self.location_counts = np.zeros((0, len(STATUSES)), dtype=np.int64)
+        self.status_counts = np.zeros(len(STATUSES), dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, capacity):
+        """배열 용량을 capacity 이상으로 늘림 (두 배씩)"""
+        new_capacity = max(capacity, len(self.temp) * 2)
+        for name in ('temp', 'pressure', 'rpm', 'count', 'status', 'location'):
+            old = getattr(self, name)
+            grown = np.empty(new_capacity, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    def add(self, temp=BASE_TEMP, pressure=BASE_PRESSURE, rpm=BASE_RPM, count=BASE_PRODUCT, status='normal',
+            location=None):
+        """팩토리 한 행 추가 후 행 번호 반환"""
+        if self.size == len(self.temp):
+            self._grow(self.size + 1)
+        row = self.size
+        self.temp[row] = temp
+        self.pressure[row] = pressure
+        self.rpm[row] = rpm
+        self.count[row] = count
+        self.status[row] = STATUS_CODES[status]
+        self.location[row] = self._location_code(location)
+        self.size += 1
+        self.location_counts[self.location[row], self.status[row]] += 1
+        self.status_counts[self.status[row]] += 1
+        return row
+
+    def _location_code(self, location):
+        """위치 번호 (처음 보는 위치면 추가)"""
+        code = self._location_codes.get(location)
+        if code is None:
+            code = self._location_codes[location] = len(self.locations)
+            self.locations.append(location)
+            self.location_counts = np.vstack([self.location_counts, np.zeros(len(STATUSES), dtype=np.int64)])
+        return code
+
+    def set_location(self, row, location):
+        """행의 위치 변경 (위치별 집계도 옮김)"""
+        code = self._location_code(location)
+        self.location_counts[self.location[row], self.status[row]] -= 1
+        self.location_counts[code, self.status[row]] += 1
+        self.location[row] = code
+
+    def set_status(self, rows, codes):
+        """행들의 상태 코드 변경 (상태별/위치별 집계를 바뀐 행만큼만 갱신)"""
+        rows = self._rows(rows)
+        codes = np.broadcast_to(np.asarray(codes, dtype=np.int8), rows.shape)
+        old = self.status[rows]
+        np.subtract.at(self.location_counts, (self.location[rows], old), 1)
+        np.add.at(self.location_counts, (self.location[rows], codes), 1)
+        np.subtract.at(self.status_counts, old, 1)
+        np.add.at(self.status_counts, codes, 1)
+        self.status[rows] = codes
+
+    def _rows(self, rows):
+        """행 번호 배열 (None이면 전체)"""
+        if rows is None:
+            return np.arange(self.size)
+        return np.asarray(rows, dtype=np.intp)
+
+    def generate_normal(self, rows=None):
+        """정상 운영 데이터 생성 (기본 값 ± 작은 변동)"""
+        rows = self._rows(rows)
+        n = len(rows)
+        self.temp[rows] = BASE_TEMP + self.rng.uniform(-5, 5, n)
+        self.pressure[rows] = BASE_PRESSURE + self.rng.uniform(-5, 5, n)
+        self.rpm[rows] = BASE_RPM + self.rng.uniform(-2, 2, n)
+        self.count[rows] = BASE_PRODUCT + self.rng.uniform(-5, 5, n)
+        self.set_status(rows, NORMAL)
+
+    def apply_abnormal(self, rows=None):
+        """비정상 데이터 생성 (행마다 과열/압력 부족/속도 문제 중 하나를 현재 값에 반영)"""
+        rows = self._rows(rows)
+        kinds = self.rng.integers(OVERHEAT, RPM_ISSUE + 1, len(rows)).astype(np.int8)
+
+        overheat = rows[kinds == OVERHEAT]
+        self.temp[overheat] += self.rng.uniform(30, 60, len(overheat))
+        low_pressure = rows[kinds == LOW_PRESSURE]
+        self.pressure[low_pressure] -= self.rng.uniform(15, 30, len(low_pressure))
+        rpm_issue = rows[kinds == RPM_ISSUE]
+        self.rpm[rpm_issue] -= self.rng.uniform(15, 25, len(rpm_issue))
+
+        self.set_status(rows, kinds)
+
+    def step(self, rows=None, abnormal_rate=0.15):
+        """전체(또는 rows) 팩토리를 한 단계 진행하고 비정상이 된 행 번호 반환"""
+        rows = self._rows(rows)
+        abnormal = self.rng.random(len(rows)) < abnormal_rate
+        self.generate_normal(rows[~abnormal])
+        self.apply_abnormal(rows[abnormal])
+        return rows[abnormal]
+
+    def location_summary(self):
+        """위치 -> 상태별 팩토리 수 (normal/warning/error)"""
+        return {
+            location: {
+                'normal': int(counts[NORMAL]),
+                'warning': int(counts[LOW_PRESSURE] + counts[RPM_ISSUE]),
+                'error': int(counts[OVERHEAT]),
+            }
+            for location, counts in zip(self.locations, self.location_counts)
+            if counts.any()
+        }
+
+    def status_name(self, row):
+        """행의 상태 이름"""
+        return STATUSES[self.status[row]]
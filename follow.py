@@ -1,58 +1,128 @@
 # follow.py
 import pandas as pd
+from wal import WriteAheadLog, write_snapshot
+from locking import synchronized, new_lock
+
+FOLLOW_COLUMNS = ['follower_id', 'followed_id']
 
 class FollowManager:
-    def __init__(self, followers_file='followers.csv'):
+    def __init__(self, followers_file='followers.csv', log_file='followers.log', compact_threshold=1000):
+        self._lock = new_lock()
         self.followers_file = followers_file
-        self.df = self.load_followers()
+        self.compact_threshold = compact_threshold
+        self.wal = WriteAheadLog(log_file)  # 스냅샷 이후의 팔로우/언팔로우 기록
+        self._followers = {}  # followed_id -> 팔로워 ID 집합
+        self._following = {}  # follower_id -> 팔로잉 ID 집합
+        self._follows_frame = None
+        for follow in self.load_followers().to_dict('records'):
+            self._link(follow['follower_id'], follow['followed_id'])
+
+        # 마지막 스냅샷 이후의 변경 로그 재적용
+        self.replay_log()
 
     def load_followers(self):
         """팔로워 데이터 로드"""
         try:
             return pd.read_csv(self.followers_file)
         except FileNotFoundError:
-            return pd.DataFrame(columns=['follower_id', 'followed_id'])
+            return pd.DataFrame(columns=FOLLOW_COLUMNS)
+
+    def _link(self, follower_id, followed_id):
+        """팔로우 관계를 양방향 인접 집합에 추가"""
+        self._followers.setdefault(followed_id, set()).add(follower_id)
+        self._following.setdefault(follower_id, set()).add(followed_id)
+        self._follows_frame = None
+
+    def _unlink(self, follower_id, followed_id):
+        """팔로우 관계를 양방향 인접 집합에서 제거"""
+        self._followers.get(followed_id, set()).discard(follower_id)
+        self._following.get(follower_id, set()).discard(followed_id)
+        self._follows_frame = None
+
+    @property
+    @synchronized
+    def df(self):
+        """전체 팔로우 관계 테이블 (변경 시에만 다시 만듦, 다른 세션이 인덱스를 바꾸는 중에는 기다림)"""
+        if self._follows_frame is None:
+            rows = [(follower_id, followed_id)
+                    for follower_id, followed_ids in self._following.items()
+                    for followed_id in followed_ids]
+            self._follows_frame = pd.DataFrame(rows, columns=FOLLOW_COLUMNS)
+        return self._follows_frame
 
     def save_followers(self):
         """팔로워 데이터 저장"""
-        self.df.to_csv(self.followers_file, index=False)
+        write_snapshot(self.df, self.followers_file)
+
+    def replay_log(self):
+        """스냅샷 위에 팔로우/언팔로우 기록을 순서대로 재적용 (같은 기록을 여러 번 적용해도 결과는 같음)"""
+        handlers = {'follow': self._link, 'unfollow': self._unlink}
+        for record in self.wal.read():
+            handler = handlers.get(record.get('op'))
+            if handler:
+                handler(record['data']['follower_id'], record['data']['followed_id'])
+
+    def persist(self, op, follower_id, followed_id):
+        """변경 기록을 로그 끝에 추가하고, 기록이 쌓이면 스냅샷으로 합침"""
+        self.wal.append(op, {'follower_id': follower_id, 'followed_id': followed_id})
+        if self.wal.record_count >= self.compact_threshold:
+            self.compact()
+
+    @synchronized
+    def compact(self):
+        """변경 로그를 새 스냅샷으로 합치고 로그 비우기"""
+        self.save_followers()
+        self.wal.clear()
+
+    def _add_follow(self, follower_id, followed_id):
+        """팔로우 관계 추가 및 저장 (로그 끝에 한 줄만 추가)"""
+        self._link(follower_id, followed_id)
+        self.persist('follow', follower_id, followed_id)
+
+    def _remove_follow(self, follower_id, followed_id):
+        """팔로우 관계 제거 및 저장 (로그 끝에 한 줄만 추가)"""
+        self._unlink(follower_id, followed_id)
+        self.persist('unfollow', follower_id, followed_id)
 
     def is_following(self, follower_id, followed_id):
         """현재 사용자가 특정 사용자를 팔로우하는지 확인"""
-        if self.df.empty:
-            return False
-        return len(self.df[
-            (self.df['follower_id'] == follower_id) & (self.df['followed_id'] == followed_id)
-        ]) > 0
+        return followed_id in self._following.get(follower_id, ())
 
+    @synchronized
     def follow_user(self, follower_id, followed_id):
         """특정 사용자를 팔로우"""
         if self.is_following(follower_id, followed_id):
             return False, "이미 팔로우 중입니다."
-        
-        new_follow = {
-            'follower_id': follower_id,
-            'followed_id': followed_id
-        }
-        self.df = pd.concat([self.df, pd.DataFrame([new_follow])], ignore_index=True)
-        self.save_followers()
+
+        self._add_follow(follower_id, followed_id)
         return True, "팔로우했습니다."
 
+    @synchronized
     def unfollow_user(self, follower_id, followed_id):
         """특정 사용자를 언팔로우"""
         if not self.is_following(follower_id, followed_id):
             return False, "팔로우하고 있지 않습니다."
-        
-        self.df = self.df[
-            ~((self.df['follower_id'] == follower_id) & (self.df['followed_id'] == followed_id))
-        ]
-        self.save_followers()
+
+        self._remove_follow(follower_id, followed_id)
         return True, "언팔로우했습니다."
 
     def get_follower_count(self, user_id):
         """특정 사용자의 팔로워 수 조회"""
-        return len(self.df[self.df['followed_id'] == user_id])
+        return len(self._followers.get(user_id, ()))
 
     def get_following_count(self, user_id):
         """특정 사용자가 팔로우하는 사람 수 조회"""
-        return len(self.df[self.df['follower_id'] == user_id])
\ No newline at end of file
+        return len(self._following.get(user_id, ()))
+
+    def follower_counts(self, user_ids):
+        """여러 사용자의 팔로워 수를 한 번에 조회 (user_id -> 팔로워 수)"""
+        return {user_id: self.get_follower_count(user_id) for user_id in user_ids}
+
+    def following_counts(self, user_ids):
+        """여러 사용자의 팔로잉 수를 한 번에 조회 (user_id -> 팔로잉 수)"""
+        return {user_id: self.get_following_count(user_id) for user_id in user_ids}
+
+    def following_among(self, follower_id, user_ids):
+        """주어진 사용자 중 follower_id가 팔로우하는 사용자 ID 집합"""
+        following = self._following.get(follower_id, set())
+        return {user_id for user_id in user_ids if user_id in following}
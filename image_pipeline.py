@@ -0,0 +1,202 @@
+# image_pipeline.py - 업로드 이미지의 해상도별 파생본 생성 및 선택
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import streamlit as st
+
+# 파생본 이름 -> 최대 가로 크기(px) (큰 것부터 차례로 줄여서 만듦)
+IMAGE_VARIANTS = {
+    'detail': 600,  # 상세 페이지
+    'feed': 400,  # 피드 카드
+    'tiny': 48,  # 창 밖 자리표시 썸네일
+}
+JPEG_QUALITY = {'detail': 82, 'feed': 80, 'tiny': 60}
+
+# 업로드 원본 최대 크기
+MAX_IMAGE_SIZE = (800, 600)
+
+# st.image는 JPEG/PNG/GIF 외 형식을 매번 다시 인코딩하므로 파생본은 JPEG(투명 배경은 PNG)로 저장
+DERIVATIVE_EXTENSIONS = ('.jpg', '.png')
+
+
+def has_alpha(image):
+    """투명 채널이 있는 이미지인지 확인"""
+    return image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def derivative_path(image_path, variant, extension='.jpg'):
+    """원본 경로에 대응하는 파생본 경로 (post_3.png -> post_3_feed.jpg)"""
+    return f"{os.path.splitext(image_path)[0]}_{variant}{extension}"
+
+
+def _save_atomic(image, path, **options):
+    """호출마다 다른 임시 파일에 다 쓴 뒤 교체 (다른 세션이 쓰는 중인 파일을 읽거나 덮어쓰지 않도록)
+
+    경로가 내용 해시라 대상 파일이 이미 있으면 같은 내용이므로 교체하지 않음
+    """
+    if os.path.exists(path):
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            image.save(f, **options)
+        if not os.path.exists(path):
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def create_derivatives(image, image_path):
+    """원본 이미지로 모든 파생본을 만들어 저장 (variant -> 경로)"""
+    alpha = has_alpha(image)
+    current = image.convert('RGBA' if alpha else 'RGB')
+    extension = '.png' if alpha else '.jpg'
+
+    paths = {}
+    for variant, width in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+        if current.width > width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+
+        path = derivative_path(image_path, variant, extension)
+        if alpha:
+            _save_atomic(current, path, format='PNG', optimize=True)
+        else:
+            _save_atomic(current, path, format='JPEG', quality=JPEG_QUALITY[variant], optimize=True, progressive=True)
+        paths[variant] = path
+    return paths
+
+
+def describe_image(image_path, width, height, derivatives):
+    """이미지 카탈로그 항목 (경로, 파일 크기, 해상도, 파생본 경로)"""
+    return {
+        'path': image_path,
+        'size': os.path.getsize(image_path),
+        'width': width,
+        'height': height,
+        'derivatives': derivatives,
+    }
+
+
+def process_upload(data, image_path):
+    """업로드 바이트를 디코딩해 원본(최대 800x600)과 파생본 저장 후 카탈로그 항목 반환 (작업 스레드에서 실행)"""
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+        # 원본 파일이 보이면 파생본도 모두 있도록 파생본을 먼저 저장
+        derivatives = create_derivatives(image, image_path)
+        image_format = Image.registered_extensions()[os.path.splitext(image_path)[1].lower()]
+        _save_atomic(image, image_path, format=image_format, optimize=True, quality=85)
+        return describe_image(image_path, image.width, image.height, derivatives)
+
+
+# PIL은 크기 조정/인코딩 중 GIL을 놓으므로 스레드 몇 개로 여러 코어를 나눠 씀
+image_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='image')
+
+
+def find_derivative(image_path, variant):
+    """이미 만들어진 파생본 경로 (없으면 None)"""
+    for extension in DERIVATIVE_EXTENSIONS:
+        path = derivative_path(image_path, variant, extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def inspect_image(image_path):
+    """이미지 파일을 확인해 카탈로그 항목 생성 (파생본이 없던 예전 이미지는 이때 한 번 만들고, 없는 파일은 None)"""
+    if not os.path.exists(image_path):
+        return None
+
+    try:
+        with Image.open(image_path) as image:
+            width, height = image.size
+            derivatives = {variant: find_derivative(image_path, variant) for variant in IMAGE_VARIANTS}
+            if not all(derivatives.values()):
+                derivatives = create_derivatives(image, image_path)
+    except (OSError, ValueError):
+        # 파생본을 만들 수 없는 이미지는 원본을 그대로 표시
+        width = height = None
+        derivatives = {}
+    return describe_image(image_path, width, height, derivatives)
+
+
+class ImageCatalog:
+    """image_path -> 검증된 이미지 정보 캐시 (렌더링 때마다 파일 시스템을 확인하지 않도록)
+
+    처음 조회할 때 한 번 파일을 확인하고 이후에는 저장/삭제 시점에만 갱신함 (없는 파일은 None으로 기억)
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, image_path):
+        """이미지 정보 조회 (없는 이미지는 None)"""
+        if not image_path or not isinstance(image_path, str):
+            return None
+        with self._lock:
+            if image_path in self._entries:
+                return self._entries[image_path]
+
+        entry = inspect_image(image_path)
+        with self._lock:
+            # 확인하는 동안 저장 완료로 등록된 항목이 있으면 그것을 사용
+            return self._entries.setdefault(image_path, entry)
+
+    def add(self, entry):
+        """저장이 끝난 이미지 등록"""
+        with self._lock:
+            self._entries[entry['path']] = entry
+
+    def discard(self, image_path):
+        """삭제된 이미지 제거"""
+        with self._lock:
+            self._entries.pop(image_path, None)
+
+    def variant_path(self, image_path, variant):
+        """표시 크기에 맞는 파생본 경로 (파생본이 없으면 원본, 이미지가 없으면 None)"""
+        entry = self.get(image_path)
+        if entry is None:
+            return None
+        return entry['derivatives'].get(variant, entry['path'])
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def remove_derivatives(image_path):
+    """원본과 함께 모든 파생본 삭제"""
+    for variant in IMAGE_VARIANTS:
+        path = find_derivative(image_path, variant)
+        if path:
+            os.remove(path)
+
+
+def preview_image(uploaded_file, width=300):
+    """업로드 미리보기용 축소 이미지 (JPEG는 축소 디코딩으로 전체 해상도를 풀지 않음)"""
+    image = Image.open(uploaded_file)
+    image.draft('RGB', (width, width))
+    image.thumbnail((width, width * 4), Image.Resampling.BILINEAR)
+    uploaded_file.seek(0)
+    return image
+
+
+def show_post_image(image_catalog, post, variant, width):
+    """게시물 이미지를 처리 상태에 맞게 표시 (처리 중/실패/파일 없음 안내 포함)"""
+    status = post.get('image_status')
+    if status == 'pending':
+        st.caption("🖼️ 이미지를 처리하는 중입니다...")
+        return
+    if status == 'failed':
+        st.write("*이미지 처리에 실패했습니다.*")
+        return
+
+    display_path = image_catalog.variant_path(post.get('image_path'), variant)
+    if display_path:
+        st.image(display_path, width=width)
+    else:
+        st.write("*이미지를 불러올 수 없습니다.*")
@@ -0,0 +1,17 @@
+# locking.py - 여러 세션이 공유하는 매니저의 동시 쓰기 보호
+import functools
+import threading
+
+
+def synchronized(method):
+    """매니저 인스턴스의 잠금을 잡은 상태로 메서드 실행"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def new_lock():
+    """같은 스레드에서 중첩 호출이 가능한 잠금 생성"""
+    return threading.RLock()
@@ -3,19 +3,81 @@ import streamlit as st
 from datetime import datetime
 import json
 import os
+import hashlib
 from PIL import Image
 import io
 from auth import AuthManager
+from wal import WriteAheadLog, write_snapshot
+from locking import synchronized, new_lock
+from timeline import Timeline
+from image_pipeline import ImageCatalog, image_pool, process_upload, remove_derivatives, preview_image, show_post_image
 import matplotlib.pyplot as plt
+from chart_cache import show_chart, draw_data_chart
+from enhanced_post_display import display_post_actions, display_posts_window
+
+LIKE_COLUMNS = ['like_id', 'post_id', 'username', 'created_at']
+
+# 게시물 종류 (JSON 내용의 type 값 + 일반 텍스트/리포스트)
+POST_KINDS = ['text', 'chart', 'factory_status', 'factory_emergency', 'repost']
+JSON_POST_KINDS = {'chart', 'factory_status', 'factory_emergency'}
+
+def classify_post(content, is_repost=False):
+    """게시물 내용으로 (종류, 우선순위) 판별 - 작성/로드 시 한 번만 호출"""
+    if isinstance(content, str) and content.startswith('{'):
+        try:
+            content_data = json.loads(content)
+        except json.JSONDecodeError:
+            content_data = None
+        if isinstance(content_data, dict) and content_data.get('type') in JSON_POST_KINDS:
+            return content_data['type'], str(content_data.get('priority') or 'normal')
+    return ('repost' if is_repost else 'text'), 'normal'
+
+# 피드 필터에 쓰는 게시물 컬럼 (컬럼 값별 post_id 집합을 유지)
+FILTER_COLUMNS = ('post_kind', 'priority', 'username')
+
+class PostFilter:
+    """타임라인을 훑으며 post_id마다 확인하는 필터 (컬럼 값별 ID 집합 조회라 전체 게시물을 다시 보지 않음)"""
+
+    def __init__(self, include, exclude):
+        self.include = include  # 조건마다 값별 ID 집합 목록 (그중 하나에 들어 있어야 함)
+        self.exclude = exclude  # 들어 있으면 제외하는 ID 집합 목록
+
+    def __contains__(self, post_id):
+        return (all(any(post_id in ids for ids in sets) for sets in self.include)
+                and not any(post_id in ids for ids in self.exclude))
 
 class PostManager:
-    def __init__(self, posts_file='posts.csv', likes_file='likes.csv', images_dir='post_images'):
+    def __init__(self, posts_file='posts.csv', likes_file='likes.csv', images_dir='post_images',
+                 storage_mode='csv', log_file='posts.log', compact_threshold=1000):
+        self._lock = new_lock()
         self.posts_file = posts_file
         self.likes_file = likes_file
         self.images_dir = images_dir
+        self.storage_mode = storage_mode  # 'csv': 매번 전체 저장, 'wal': 변경 로그 추가
+        self.compact_threshold = compact_threshold
+        self.wal = WriteAheadLog(log_file) if storage_mode == 'wal' else None
         self.posts_df = self.load_posts()
-        self.likes_df = self.load_likes()
-        
+        self._post_rows = {}  # post_id -> posts_df 행 라벨
+        self._deleted_labels = set()  # 삭제 표시만 하고 아직 posts_df에 남아 있는 행 라벨
+        self._timeline = Timeline()  # 전체 게시물 (작성 시각 순)
+        self._user_timelines = {}  # username -> 사용자 게시물 Timeline
+        self._filter_ids = {}  # 필터 컬럼 -> {값: post_id 집합}
+        self._image_refs = {}  # image_path -> 그 이미지를 쓰는 게시물 수
+        self._image_jobs = {}  # image_path -> 처리 중인 작업 Future
+        self.image_catalog = ImageCatalog()  # 렌더링에 쓰는 검증된 이미지 정보
+        self._rebuild_post_index()
+        self._likes = {}  # (post_id, username) -> 좋아요 레코드
+        self._likes_by_post = {}  # post_id -> {username: 좋아요 레코드}
+        self._likes_by_user = {}  # username -> {post_id: 좋아요 레코드}
+        self._max_like_id = 0
+        self._likes_frame = None
+        self._index_likes(self.load_likes())
+
+        # 마지막 스냅샷 이후의 변경 로그 재적용
+        if self.wal:
+            self.replay_log()
+        self._settle_pending_images()
+
         # 이미지 저장 디렉토리 생성
         if not os.path.exists(self.images_dir):
             os.makedirs(self.images_dir)
@@ -35,32 +97,258 @@ class PostManager:
             df['image_path'] = df['image_path'].where(df['image_path'].notna(), None)
             # fillna 대신 직접 None 값을 False로 변경
             df.loc[df['has_image'].isna(), 'has_image'] = False
+            
+            self._classify_posts(df)
+            # 이미지 처리 상태 (비어 있으면 처리 완료된 예전 이미지)
+            df['image_status'] = df['image_status'].astype(object) if 'image_status' in df.columns else None
                 
             return df
         except FileNotFoundError:
             return pd.DataFrame(columns=[
                 'post_id', 'username', 'content', 'created_at', 
                 'is_repost', 'original_post_id', 'like_count', 'repost_count',
-                'has_image', 'image_path'
+                'has_image', 'image_path', 'post_kind', 'priority', 'image_status'
             ])
     
+    def _classify_posts(self, df):
+        """종류/우선순위 컬럼이 비어 있는 게시물만 분류해서 채움"""
+        for column in ('post_kind', 'priority'):
+            df[column] = df[column].astype(object) if column in df.columns else None
+        missing = df['post_kind'].isna()
+        if missing.any():
+            classified = [classify_post(content, bool(is_repost)) for content, is_repost
+                          in zip(df.loc[missing, 'content'], df.loc[missing, 'is_repost'])]
+            df.loc[missing, 'post_kind'] = [kind for kind, _ in classified]
+            df.loc[missing, 'priority'] = [priority for _, priority in classified]
+    
     def load_likes(self):
         """좋아요 데이터 로드"""
         try:
             return pd.read_csv(self.likes_file)
         except FileNotFoundError:
-            return pd.DataFrame(columns=['like_id', 'post_id', 'username', 'created_at'])
+            return pd.DataFrame(columns=LIKE_COLUMNS)
+    
+    def _index_likes(self, likes_df):
+        """좋아요 데이터로 (post_id, username) 집합과 게시물/사용자별 목록 구성"""
+        for like in likes_df.to_dict('records'):
+            self._add_like_record(like)
+    
+    def _add_like_record(self, like):
+        """좋아요 레코드를 모든 인덱스에 추가"""
+        self._likes[(like['post_id'], like['username'])] = like
+        self._likes_by_post.setdefault(like['post_id'], {})[like['username']] = like
+        self._likes_by_user.setdefault(like['username'], {})[like['post_id']] = like
+        self._max_like_id = max(self._max_like_id, like['like_id'])
+        self._likes_frame = None
+    
+    def _remove_like_record(self, post_id, username):
+        """좋아요 레코드를 모든 인덱스에서 제거"""
+        self._likes.pop((post_id, username), None)
+        self._likes_by_post.get(post_id, {}).pop(username, None)
+        self._likes_by_user.get(username, {}).pop(post_id, None)
+        self._likes_frame = None
+    
+    @property
+    @synchronized
+    def likes_df(self):
+        """전체 좋아요 테이블 (변경 시에만 다시 만듦, 다른 세션이 인덱스를 바꾸는 중에는 기다림)"""
+        if self._likes_frame is None:
+            self._likes_frame = self._likes_to_frame(self._likes.values())
+        return self._likes_frame
+    
+    def _likes_to_frame(self, likes):
+        """좋아요 레코드 목록을 DataFrame으로 변환"""
+        return pd.DataFrame(list(likes), columns=LIKE_COLUMNS)
     
     def save_posts(self):
-        """게시물 데이터 저장"""
-        self.posts_df.to_csv(self.posts_file, index=False)
+        """게시물 데이터 저장 (삭제 표시된 행 제외)"""
+        self._snapshot_posts().to_csv(self.posts_file, index=False)
+    
+    def _snapshot_posts(self):
+        """파일에 쓸 게시물 테이블 (삭제 표시된 행을 빼고, 삭제된 원본을 가리키는 리포스트는 원본 ID를 비움)"""
+        posts = self.posts_df
+        if self._deleted_labels:
+            posts = posts.drop(index=list(self._deleted_labels))
+        dangling = posts['original_post_id'].notna() & ~posts['original_post_id'].isin(list(self._post_rows))
+        if dangling.any():
+            posts = posts.copy()
+            posts.loc[dangling, 'original_post_id'] = None
+        return posts
+    
+    def get_all_posts(self):
+        """전체 게시물 테이블 (삭제 표시된 행 제외)"""
+        if not self._deleted_labels:
+            return self.posts_df
+        return self.posts_df.drop(index=list(self._deleted_labels))
     
     def save_likes(self):
         """좋아요 데이터 저장"""
         self.likes_df.to_csv(self.likes_file, index=False)
-    
+
+    def persist(self, op, data, posts=True, likes=False):
+        """변경 사항 저장 (wal 모드는 로그에 추가, csv 모드는 파일 전체 저장)"""
+        if self.wal:
+            self.wal.append(op, data)
+            if self.wal.record_count >= self.compact_threshold:
+                self.compact()
+            return
+
+        if posts:
+            self.save_posts()
+        if likes:
+            self.save_likes()
+
+    def replay_log(self):
+        """스냅샷 위에 변경 로그를 순서대로 재적용"""
+        handlers = {
+            'create_post': self._apply_create_post,
+            'add_like': self._apply_add_like,
+            'remove_like': lambda data: self._apply_remove_like(data['post_id'], data['username']),
+            'set_repost_count': lambda data: self._apply_set_repost_count(data['post_id'], data['repost_count']),
+            'delete_post': lambda data: self._apply_delete_post(data['post_id']),
+            'set_image_status': lambda data: self._apply_set_image_status(data['post_id'], data['image_status']),
+        }
+
+        records = self.wal.read()
+        for record in records:
+            handler = handlers.get(record.get('op'))
+            if handler:
+                handler(record['data'])
+        if records:
+            # compact가 게시물 스냅샷만 바꾸고 중단됐으면 좋아요 수가 로그와 겹치므로 좋아요 집합 기준으로 다시 셈
+            self._recount_likes()
+
+    def _recount_likes(self):
+        """게시물 좋아요 수를 좋아요 레코드 수로 다시 계산"""
+        self.posts_df['like_count'] = [len(self._likes_by_post.get(post_id, ()))
+                                       for post_id in self.posts_df['post_id']]
+
+    @synchronized
+    def compact(self):
+        """변경 로그를 새 스냅샷으로 합치고 로그 비우기 (삭제 표시된 행은 이때 실제로 제거)"""
+        self.posts_df = self._snapshot_posts()
+        self._deleted_labels = set()
+        write_snapshot(self.posts_df, self.posts_file)
+        write_snapshot(self.likes_df, self.likes_file)
+        if self.wal:
+            self.wal.clear()
+
+    def _rebuild_post_index(self):
+        """post_id -> 행 라벨 인덱스와 작성 시각 순 타임라인 재구성"""
+        self.posts_df = self.posts_df.reset_index(drop=True)
+        self._post_rows = {post_id: label for label, post_id in enumerate(self.posts_df['post_id'])}
+        self._deleted_labels = set()
+        self._next_label = len(self.posts_df)
+        self._timeline = Timeline()
+        self._user_timelines = {}
+        ordered = self.posts_df.sort_values(['created_at', 'post_id'])
+        for post_id, username, created_at in zip(ordered['post_id'], ordered['username'], ordered['created_at']):
+            self._index_post_time(post_id, username, created_at)
+        self._filter_ids = {column: {} for column in FILTER_COLUMNS}
+        for post_id, *values in zip(self.posts_df['post_id'], *(self.posts_df[column] for column in FILTER_COLUMNS)):
+            self._index_post_filters(post_id, values)
+        self._image_refs = self.posts_df['image_path'].dropna().value_counts().to_dict()
+
+    def _index_post_time(self, post_id, username, created_at):
+        """게시물을 전체/사용자별 타임라인에 추가"""
+        self._timeline.add(created_at, post_id)
+        self._user_timelines.setdefault(username, Timeline()).add(created_at, post_id)
+
+    def _index_post_filters(self, post_id, values):
+        """게시물을 필터 컬럼 값별 ID 집합에 추가 (values: FILTER_COLUMNS 순서의 값)"""
+        for column, value in zip(FILTER_COLUMNS, values):
+            self._filter_ids[column].setdefault(value, set()).add(post_id)
+
+    def _unindex_post_filters(self, post_id, values):
+        """게시물을 필터 컬럼 값별 ID 집합에서 제거"""
+        for column, value in zip(FILTER_COLUMNS, values):
+            ids = self._filter_ids[column].get(value)
+            if ids is not None:
+                ids.discard(post_id)
+                if not ids:
+                    del self._filter_ids[column][value]
+
+    def _rows_for(self, post_ids):
+        """post_id 목록 순서대로 posts_df 행 선택"""
+        return self.posts_df.loc[[self._post_rows[post_id] for post_id in post_ids]]
+
+    def _apply_create_post(self, post):
+        """게시물 추가 (같은 ID가 이미 있으면 무시)"""
+        if post['post_id'] in self._post_rows:
+            return
+        if pd.isna(post.get('post_kind')):
+            # 분류 컬럼이 생기기 전에 기록된 로그 레코드
+            post = dict(post)
+            post['post_kind'], post['priority'] = classify_post(post['content'], bool(post['is_repost']))
+        label = self._next_label
+        self.posts_df = pd.concat([self.posts_df, pd.DataFrame([post], index=[label])])
+        self._next_label += 1
+        self._post_rows[post['post_id']] = label
+        self._index_post_time(post['post_id'], post['username'], post['created_at'])
+        self._index_post_filters(post['post_id'], [post[column] for column in FILTER_COLUMNS])
+        if isinstance(post.get('image_path'), str):
+            self._image_refs[post['image_path']] = self._image_refs.get(post['image_path'], 0) + 1
+
+    def _apply_add_like(self, like):
+        """좋아요 추가 및 게시물 좋아요 수 증가 (중복 적용 시 무시)"""
+        if (like['post_id'], like['username']) in self._likes:
+            return
+        self._add_like_record(like)
+        label = self._post_rows.get(like['post_id'])
+        if label is not None:
+            self.posts_df.at[label, 'like_count'] += 1
+
+    def _apply_remove_like(self, post_id, username):
+        """좋아요 제거 및 게시물 좋아요 수 감소 (없으면 무시)"""
+        if (post_id, username) not in self._likes:
+            return
+        self._remove_like_record(post_id, username)
+        label = self._post_rows.get(post_id)
+        if label is not None:
+            self.posts_df.at[label, 'like_count'] -= 1
+
+    def _apply_set_repost_count(self, post_id, repost_count):
+        """게시물 리포스트 수 설정"""
+        label = self._post_rows.get(post_id)
+        if label is not None:
+            self.posts_df.at[label, 'repost_count'] = repost_count
+
+    def _settle_pending_images(self):
+        """이전 실행에서 처리가 끝나지 않은 이미지 상태 정리 (파일이 있으면 ready, 없으면 failed)"""
+        pending = self.posts_df[self.posts_df['image_status'] == 'pending']
+        for post_id, image_path in zip(pending['post_id'], pending['image_path']):
+            self._apply_set_image_status(post_id, 'ready' if os.path.exists(image_path) else 'failed')
+
+    def _apply_set_image_status(self, post_id, image_status):
+        """게시물 이미지 처리 상태 설정"""
+        label = self._post_rows.get(post_id)
+        if label is not None:
+            self.posts_df.at[label, 'image_status'] = image_status
+
+    def _apply_delete_post(self, post_id):
+        """게시물과 관련 좋아요 삭제 (행은 삭제 표시만 하고 compact/저장 시 제거)"""
+        # 게시물이 이미 스냅샷에서 빠졌어도 이전 좋아요 스냅샷에 남은 레코드는 지움
+        for username in list(self._likes_by_post.get(post_id, {})):
+            self._remove_like_record(post_id, username)
+        self._likes_by_post.pop(post_id, None)
+        label = self._post_rows.pop(post_id, None)
+        if label is None:
+            return
+        username = self.posts_df.at[label, 'username']
+        image_path = self.posts_df.at[label, 'image_path']
+        if isinstance(image_path, str):
+            self._image_refs[image_path] -= 1
+            if not self._image_refs[image_path]:
+                del self._image_refs[image_path]
+        self._deleted_labels.add(label)
+        self._unindex_post_filters(post_id, [self.posts_df.at[label, column] for column in FILTER_COLUMNS])
+        self._timeline.remove(post_id)
+        self._user_timelines[username].remove(post_id)
+        # 이 게시물을 원본으로 하는 리포스트는 조회 시 원본이 없으므로 "삭제된 게시물"로 표시되고,
+        # 파일에 쓸 때 original_post_id를 비움 (_snapshot_posts)
+
     def get_next_post_id(self):
-        """새로운 게시물 ID 생성"""
+        """새로운 게시물 ID 생성 (삭제 표시된 행도 포함해서 ID를 다시 쓰지 않음)"""
         if len(self.posts_df) == 0:
             return 1
         else:
@@ -68,38 +356,68 @@ class PostManager:
     
     def get_next_like_id(self):
         """새로운 좋아요 ID 생성"""
-        if len(self.likes_df) == 0:
-            return 1
-        else:
-            return self.likes_df['like_id'].max() + 1
+        return self._max_like_id + 1
+    
+    def image_upload_path(self, uploaded_file):
+        """업로드 이미지 형식 확인 후 내용 해시로 저장될 경로 결정 (같은 이미지는 같은 경로)"""
+        # 파일 확장자 확인
+        file_extension = uploaded_file.name.split('.')[-1].lower()
+        if file_extension not in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
+            return None, "지원하지 않는 이미지 형식입니다."
+        
+        # 이미지 파일명 생성 (업로드 내용의 SHA-256)
+        digest = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+        return os.path.join(self.images_dir, f"{digest}.{file_extension}"), None
+    
+    def image_ref_count(self, image_path):
+        """이미지를 참조하는 게시물 수"""
+        return self._image_refs.get(image_path, 0)
     
-    def save_image(self, uploaded_file, post_id):
-        """업로드된 이미지 저장"""
+    def save_image(self, uploaded_file, post_id, image_path):
+        """업로드된 이미지를 작업 스레드에서 저장 (끝나면 finish_image가 상태 기록)
+        
+        같은 이미지를 이미 처리 중이면 새로 처리하지 않고 그 작업 결과를 함께 기다림
+        """
+        future = self._image_jobs.get(image_path)
+        if future is None:
+            # 디코딩/크기 조정/인코딩은 게시물 작성과 따로 작업 스레드에서 처리
+            future = image_pool.submit(process_upload, uploaded_file.getvalue(), image_path)
+            self._image_jobs[image_path] = future
+        future.add_done_callback(lambda done: self.finish_image(post_id, image_path, done))
+    
+    @synchronized
+    def finish_image(self, post_id, image_path, future):
+        """이미지 처리 작업 완료 시 게시물의 이미지 상태를 ready/failed로 기록"""
+        if self._image_jobs.get(image_path) is future:
+            del self._image_jobs[image_path]
+        error = future.exception()
+        if error is not None:
+            print(f"이미지 처리 중 오류: {error}")
+        elif self.image_ref_count(image_path) == 0:
+            # 처리 중에 마지막 참조 게시물이 삭제되었으면 남은 파일 정리
+            self.remove_image_files(image_path)
+        else:
+            self.image_catalog.add(future.result())
+        
+        post = self.get_post_by_id(post_id)
+        if not post:
+            return
+        image_status = 'failed' if error is not None else 'ready'
+        if post.get('image_status') != image_status:
+            self._apply_set_image_status(post_id, image_status)
+            self.persist('set_image_status', {'post_id': post_id, 'image_status': image_status})
+    
+    def remove_image_files(self, image_path):
+        """이미지 원본과 파생본 파일 삭제"""
+        self.image_catalog.discard(image_path)
         try:
-            # 파일 확장자 확인
-            file_extension = uploaded_file.name.split('.')[-1].lower()
-            if file_extension not in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
-                return None, "지원하지 않는 이미지 형식입니다."
-            
-            # 이미지 파일명 생성
-            image_filename = f"post_{post_id}.{file_extension}"
-            image_path = os.path.join(self.images_dir, image_filename)
-            
-            # 이미지 크기 조정 및 저장
-            image = Image.open(uploaded_file)
-            
-            # 이미지 크기 제한 (최대 800x600)
-            max_size = (800, 600)
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # 이미지 저장
-            image.save(image_path, optimize=True, quality=85)
-            
-            return image_path, "이미지가 저장되었습니다."
-            
+            if os.path.exists(image_path):
+                os.remove(image_path)
+            remove_derivatives(image_path)
         except Exception as e:
-            return None, f"이미지 저장 중 오류가 발생했습니다: {str(e)}"
+            print(f"이미지 삭제 중 오류: {e}")
     
+    @synchronized
     def create_post(self, username, content, uploaded_image=None):
         """새 게시물 작성"""
         if not content.strip() and not uploaded_image:
@@ -111,12 +429,18 @@ class PostManager:
         
         # 이미지 처리
         if uploaded_image is not None:
-            image_path, image_message = self.save_image(uploaded_image, post_id)
+            image_path, image_message = self.image_upload_path(uploaded_image)
             if image_path:
                 has_image = True
             else:
                 return False, image_message
         
+        # 같은 내용의 이미지가 이미 저장되어 있으면 처리 없이 바로 사용
+        image_status = None
+        if has_image:
+            image_status = 'ready' if self.image_catalog.get(image_path) else 'pending'
+        
+        post_kind, priority = classify_post(content.strip())
         new_post = {
             'post_id': post_id,
             'username': username,
@@ -127,14 +451,22 @@ class PostManager:
             'like_count': 0,
             'repost_count': 0,
             'has_image': has_image,
-            'image_path': image_path if has_image else None
+            'image_path': image_path if has_image else None,
+            'post_kind': post_kind,
+            'priority': priority,
+            'image_status': image_status
         }
         
-        self.posts_df = pd.concat([self.posts_df, pd.DataFrame([new_post])], ignore_index=True)
-        self.save_posts()
+        self._apply_create_post(new_post)
+        self.persist('create_post', new_post)
+        
+        # 게시물을 먼저 올리고 이미지는 준비되는 대로 붙임
+        if image_status == 'pending':
+            self.save_image(uploaded_image, post_id, image_path)
         
         return True, "게시물이 작성되었습니다!"
     
+    @synchronized
     def create_repost(self, username, original_post_id, comment=""):
         """리포스트 작성"""
         # 원본 게시물 확인
@@ -152,17 +484,23 @@ class PostManager:
             'like_count': 0,
             'repost_count': 0,
             'has_image': False,
-            'image_path': None
+            'image_path': None,
+            'post_kind': 'repost',
+            'priority': 'normal',
+            'image_status': None
         }
         
-        self.posts_df = pd.concat([self.posts_df, pd.DataFrame([new_repost])], ignore_index=True)
+        self._apply_create_post(new_repost)
         
         # 원본 게시물의 리포스트 카운트 증가
-        self.posts_df.loc[self.posts_df['post_id'] == original_post_id, 'repost_count'] += 1
-        self.save_posts()
+        repost_count = int(original_post['repost_count']) + 1
+        self._apply_set_repost_count(original_post_id, repost_count)
+        self.persist('create_post', new_repost)
+        self.persist('set_repost_count', {'post_id': original_post_id, 'repost_count': repost_count})
         
         return True, "리포스트되었습니다!"
     
+    @synchronized
     def delete_post(self, post_id, username):
         """게시물 삭제 (본인 게시물만)"""
         # 게시물 존재 및 소유권 확인
@@ -173,91 +511,124 @@ class PostManager:
         if post['username'] != username:
             return False, "본인의 게시물만 삭제할 수 있습니다."
         
-        # 이미지 파일 삭제
-        if post.get('has_image') and post.get('image_path'):
-            try:
-                if os.path.exists(post['image_path']):
-                    os.remove(post['image_path'])
-            except Exception as e:
-                print(f"이미지 삭제 중 오류: {e}")
-        
-        # 게시물 삭제
-        self.posts_df = self.posts_df[self.posts_df['post_id'] != post_id]
-        
-        # 해당 게시물의 좋아요 데이터도 삭제
-        self.likes_df = self.likes_df[self.likes_df['post_id'] != post_id]
+        # 게시물 및 해당 게시물의 좋아요 데이터 삭제
+        self._apply_delete_post(post_id)
+        self.persist('delete_post', {'post_id': post_id}, likes=True)
         
-        # 만약 이 게시물이 원본이고 리포스트된 게시물들이 있다면, 
-        # 리포스트 게시물들의 original_post_id를 None으로 설정 (삭제된 게시물 표시용)
-        self.posts_df.loc[self.posts_df['original_post_id'] == post_id, 'original_post_id'] = None
-        
-        self.save_posts()
-        self.save_likes()
+        # 이미지 파일은 마지막 참조가 사라질 때만 삭제 (처리 중이면 finish_image가 정리)
+        image_path = post.get('image_path') if post.get('has_image') else None
+        if isinstance(image_path, str) and self.image_ref_count(image_path) == 0 and image_path not in self._image_jobs:
+            self.remove_image_files(image_path)
         
         return True, "게시물이 삭제되었습니다."
     
+    @synchronized
     def toggle_like(self, post_id, username):
         """좋아요 토글 (좋아요 추가/제거)"""
         # 이미 좋아요를 눌렀는지 확인
-        existing_like = self.likes_df[
-            (self.likes_df['post_id'] == post_id) & 
-            (self.likes_df['username'] == username)
-        ]
-        
-        if len(existing_like) > 0:
-            # 좋아요 제거
-            self.likes_df = self.likes_df[
-                ~((self.likes_df['post_id'] == post_id) & 
-                  (self.likes_df['username'] == username))
-            ]
-            # 게시물의 좋아요 카운트 감소
-            self.posts_df.loc[self.posts_df['post_id'] == post_id, 'like_count'] -= 1
+        if self.user_liked_post(post_id, username):
+            # 좋아요 제거 (게시물의 좋아요 카운트 감소)
+            self._apply_remove_like(post_id, username)
+            self.persist('remove_like', {'post_id': post_id, 'username': username}, likes=True)
             action = "removed"
         else:
-            # 좋아요 추가
+            # 좋아요 추가 (게시물의 좋아요 카운트 증가)
             new_like = {
                 'like_id': self.get_next_like_id(),
                 'post_id': post_id,
                 'username': username,
                 'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            self.likes_df = pd.concat([self.likes_df, pd.DataFrame([new_like])], ignore_index=True)
-            # 게시물의 좋아요 카운트 증가
-            self.posts_df.loc[self.posts_df['post_id'] == post_id, 'like_count'] += 1
+            self._apply_add_like(new_like)
+            self.persist('add_like', new_like, likes=True)
             action = "added"
         
-        self.save_likes()
-        self.save_posts()
-        
         return action
     
     def get_post_by_id(self, post_id):
         """게시물 ID로 게시물 조회"""
-        post = self.posts_df[self.posts_df['post_id'] == post_id]
-        if len(post) > 0:
-            return post.iloc[0].to_dict()
+        label = self._post_rows.get(post_id)
+        if label is not None:
+            return self.posts_df.loc[label].to_dict()
         return None
     
-    def get_posts_feed(self, limit=10):
-        """피드용 게시물 조회 (최신순)"""
-        return self.posts_df.sort_values('created_at', ascending=False).head(limit)
+    def get_posts_by_ids(self, post_ids):
+        """여러 게시물을 한 번에 조회 (post_id -> 게시물 dict, 없는 ID는 제외)"""
+        found_ids = []
+        labels = []
+        for post_id in post_ids:
+            label = self._post_rows.get(post_id)
+            if label is not None:
+                found_ids.append(post_id)
+                labels.append(label)
+        
+        if not labels:
+            return {}
+        records = self.posts_df.loc[labels].to_dict('records')
+        return dict(zip(found_ids, records))
+    
+    @synchronized
+    def get_posts_feed(self, limit=10, kind=None, priority=None, usernames=None, exclude_users=None):
+        """피드용 게시물 조회 (최신순, 필터는 limit 적용 전에 반영)"""
+        keep = self._filter_post_ids(kind, priority, usernames, exclude_users)
+        return self._rows_for(self._timeline.latest(limit, keep))
+    
+    @synchronized
+    def get_posts_page(self, cursor=None, limit=10, kind=None, priority=None, usernames=None, exclude_users=None):
+        """커서 이후(더 오래된) 게시물 한 페이지 조회 (게시물 DataFrame, 다음 커서 또는 None)"""
+        keep = self._filter_post_ids(kind, priority, usernames, exclude_users)
+        post_ids, next_cursor = self._timeline.page(cursor, limit, keep)
+        return self._rows_for(post_ids), next_cursor
+    
+    def _filter_post_ids(self, kind=None, priority=None, usernames=None, exclude_users=None):
+        """조건에 맞는 post_id인지 확인하는 PostFilter (조건이 없으면 None)
+        
+        컬럼 값별 ID 집합만 모아 두고 타임라인을 훑을 때 하나씩 확인하므로 한 페이지 비용은 훑은 항목 수에 비례
+        """
+        def value_sets(column, values):
+            values = [values] if isinstance(values, str) else values
+            return [self._filter_ids[column][value] for value in values if value in self._filter_ids[column]]
+        
+        include = [value_sets(column, values) for column, values
+                   in (('post_kind', kind), ('priority', priority), ('username', usernames)) if values is not None]
+        exclude = value_sets('username', exclude_users) if exclude_users is not None else []
+        if not include and exclude_users is None:
+            return None
+        return PostFilter(include, exclude)
+    
+    @synchronized
+    def get_user_posts(self, username, limit=None):
+        """사용자가 작성한 게시물 조회 (최신순)"""
+        timeline = self._user_timelines.get(username)
+        return self._rows_for(timeline.latest(limit) if timeline else [])
     
     def user_liked_post(self, post_id, username):
         """사용자가 해당 게시물에 좋아요를 눌렀는지 확인"""
-        return len(self.likes_df[
-            (self.likes_df['post_id'] == post_id) & 
-            (self.likes_df['username'] == username)
-        ]) > 0
+        return (post_id, username) in self._likes
+    
+    def liked_post_ids(self, username, post_ids):
+        """주어진 게시물 중 사용자가 좋아요를 누른 게시물 ID 집합 (피드 한 페이지를 한 번에 조회)"""
+        user_likes = self._likes_by_user.get(username, {})
+        return {post_id for post_id in post_ids if post_id in user_likes}
     
+    @synchronized
     def get_post_likes(self, post_id):
         """게시물의 좋아요 목록 조회"""
-        return self.likes_df[self.likes_df['post_id'] == post_id].sort_values('created_at', ascending=False)
+        likes = self._likes_to_frame(self._likes_by_post.get(post_id, {}).values())
+        return likes.sort_values('created_at', ascending=False)
+    
+    @synchronized
+    def get_user_likes(self, username):
+        """사용자가 누른 좋아요 목록 조회 (최신순)"""
+        likes = self._likes_to_frame(self._likes_by_user.get(username, {}).values())
+        return likes.sort_values('created_at', ascending=False)
 
 
-def display_profile_emoji(auth_manager, username, size=50):
-    """프로필 이모지를 표시하는 공통 함수"""
-    if auth_manager:
-        emoji = auth_manager.get_user_profile_emoji(username)
+def display_profile_emoji(auth_manager, username, size=50, emoji=None):
+    """프로필 이모지를 표시하는 공통 함수 (emoji: 미리 조회한 이모지)"""
+    if emoji is not None or auth_manager:
+        if emoji is None:
+            emoji = auth_manager.get_user_profile_emoji(username)
         st.markdown(
             f"<div style='font-size: {size}px; text-align: center;'>{emoji}</div>",
             unsafe_allow_html=True
@@ -286,8 +657,7 @@ def create_post_form(post_manager, username):
             # 업로드된 이미지 미리보기
             if uploaded_image is not None:
                 st.write("**이미지 미리보기:**")
-                image = Image.open(uploaded_image)
-                st.image(image, width=300)
+                st.image(preview_image(uploaded_image, width=300), width=300)
             
             if st.button("게시하기", key="create_post_btn"):
                 success, message = post_manager.create_post(username, post_content, uploaded_image)
@@ -327,15 +697,17 @@ def create_post_form(post_manager, username):
                 else:
                     st.error("제목을 입력해주세요.")
 
-def display_post(post, post_manager, current_username, show_actions=True, auth_manager=None):
-    """개별 게시물 표시"""
+def display_post(post, post_manager, current_username, show_actions=True, auth_manager=None,
+                 original_posts=None, liked_post_ids=None, profile_emojis=None):
+    """개별 게시물 표시 (original_posts/liked_post_ids/profile_emojis: 피드 단위로 미리 조회한 값)"""
     with st.container():
         # 게시물 정보
         col1, col2, col3 = st.columns([1, 5, 1])
         
         with col1:
             # 프로필 이모지 표시 (auth_manager가 있을 때)
-            display_profile_emoji(auth_manager, post['username'], size=50)
+            emoji = profile_emojis.get(post['username']) if profile_emojis is not None else None
+            display_profile_emoji(auth_manager, post['username'], size=50, emoji=emoji)
         
         with col2:
             st.markdown(f"**{post['username']}** · {post['created_at']}")
@@ -348,15 +720,8 @@ def display_post(post, post_manager, current_username, show_actions=True, auth_m
                     if content_data and isinstance(content_data, dict) and content_data.get('type') == 'chart':
                         is_data_post = True
                         st.markdown(f"### {content_data.get('title', '데이터 비교')}")
-                        
-                        data = content_data.get('data', {})
-                        labels = list(data.keys())
-                        values = list(data.values())
-    
-                        fig, ax = plt.subplots()
-                        ax.bar(labels, values)
-                        ax.set_title(content_data.get('title'))
-                        st.pyplot(fig)
+                        show_chart('data', {'title': content_data.get('title'), 'data': content_data.get('data', {})},
+                                   draw_data_chart)
                 except (json.JSONDecodeError, AttributeError):
                     pass
             
@@ -366,18 +731,17 @@ def display_post(post, post_manager, current_username, show_actions=True, auth_m
                         st.write(post['content'])
                         st.markdown("---")
                     
-                    original_post = post_manager.get_post_by_id(post['original_post_id'])
+                    if original_posts is not None:
+                        original_post = original_posts.get(post['original_post_id'])
+                    else:
+                        original_post = post_manager.get_post_by_id(post['original_post_id'])
                     if original_post:
                         st.markdown("🔄 **리포스트된 게시물:**")
                         st.markdown(f"**{original_post['username']}** · {original_post['created_at']}")
                         st.write(original_post['content'])
                         
                         if original_post.get('has_image') and original_post.get('image_path'):
-                            original_image_path = original_post.get('image_path')
-                            if original_image_path and isinstance(original_image_path, str) and os.path.exists(original_image_path):
-                                st.image(original_image_path, width=400)
-                            else:
-                                st.write("*이미지를 불러올 수 없습니다.*")
+                            show_post_image(post_manager.image_catalog, original_post, 'feed', width=400)
                     else:
                         st.write("*삭제된 게시물입니다.*")
                 else:
@@ -385,11 +749,7 @@ def display_post(post, post_manager, current_username, show_actions=True, auth_m
                         st.write(post['content'])
 
             if post.get('has_image') and post.get('image_path'):
-                image_path = post.get('image_path')
-                if image_path and isinstance(image_path, str) and os.path.exists(image_path):
-                    st.image(image_path, width=400)
-                else:
-                    st.write("*이미지를 불러올 수 없습니다.*")
+                show_post_image(post_manager.image_catalog, post, 'feed', width=400)
 
         with col3:
             if st.button("📄", key=f"detail_{post['post_id']}", help="게시물 상세보기"):
@@ -398,39 +758,8 @@ def display_post(post, post_manager, current_username, show_actions=True, auth_m
                 st.rerun()
         
         if show_actions:
-            col_like, col_repost, col_stats = st.columns([1, 1, 4])
-            
-            with col_like:
-                liked = post_manager.user_liked_post(post['post_id'], current_username)
-                like_emoji = "❤️" if liked else "🤍"
-                if st.button(f"{like_emoji} {post['like_count']}", key=f"like_{post['post_id']}"):
-                    post_manager.toggle_like(post['post_id'], current_username)
-                    st.rerun()
-            
-            with col_repost:
-                if st.button(f"🔄 {post['repost_count']}", key=f"repost_{post['post_id']}"):
-                    st.session_state[f"show_repost_{post['post_id']}"] = True
-                    st.rerun()
-            
-            if st.session_state.get(f"show_repost_{post['post_id']}", False):
-                with st.expander("리포스트하기", expanded=True):
-                    repost_comment = st.text_area("코멘트 추가 (선택사항)", key="detail_repost_comment")
-                    col_submit, col_cancel = st.columns(2)
-                    
-                    with col_submit:
-                        if st.button("리포스트하기", key="detail_submit_repost"):
-                            success, message = post_manager.create_repost(current_username, post['post_id'], repost_comment)
-                            if success:
-                                st.success(message)
-                                st.session_state.show_detail_repost = False
-                                st.rerun()
-                            else:
-                                st.error(message)
-                    
-                    with col_cancel:
-                        if st.button("취소", key="detail_cancel_repost"):
-                            st.session_state.show_detail_repost = False
-                            st.rerun()
+            liked = post['post_id'] in liked_post_ids if liked_post_ids is not None else None
+            display_post_actions(post, post_manager, current_username, liked)
         
         st.write("---")
 
@@ -475,15 +804,8 @@ def post_detail_page(post_manager, current_username, auth_manager=None):
                     if content_data and isinstance(content_data, dict) and content_data.get('type') == 'chart':
                         is_data_post = True
                         st.markdown(f"### {content_data.get('title', '데이터 비교')}")
-                        
-                        data = content_data.get('data', {})
-                        labels = list(data.keys())
-                        values = list(data.values())
-
-                        fig, ax = plt.subplots()
-                        ax.bar(labels, values)
-                        ax.set_title(content_data.get('title'))
-                        st.pyplot(fig)
+                        show_chart('data', {'title': content_data.get('title'), 'data': content_data.get('data', {})},
+                                   draw_data_chart)
                 except (json.JSONDecodeError, AttributeError):
                     pass
 
@@ -503,11 +825,7 @@ def post_detail_page(post_manager, current_username, auth_manager=None):
                         st.write(original_post['content'])
                         
                         if original_post.get('has_image') and original_post.get('image_path'):
-                            original_image_path = original_post.get('image_path')
-                            if original_image_path and isinstance(original_image_path, str) and os.path.exists(original_image_path):
-                                st.image(original_image_path, width=500)
-                            else:
-                                st.write("*이미지를 불러올 수 없습니다.*")
+                            show_post_image(post_manager.image_catalog, original_post, 'detail', width=500)
                     else:
                         st.write("*삭제된 게시물입니다.*")
                 else:
@@ -517,11 +835,7 @@ def post_detail_page(post_manager, current_username, auth_manager=None):
             
             if post.get('has_image') and post.get('image_path'):
                 st.markdown("**첨부 이미지:**")
-                image_path = post.get('image_path')
-                if image_path and isinstance(image_path, str) and os.path.exists(image_path):
-                    st.image(image_path, width=600)
-                else:
-                    st.write("*이미지를 불러올 수 없습니다.*")
+                show_post_image(post_manager.image_catalog, post, 'detail', width=600)
     
     st.write("---")
     
@@ -543,10 +857,11 @@ def post_detail_page(post_manager, current_username, auth_manager=None):
     likes = post_manager.get_post_likes(post_id)
     
     if len(likes) > 0:
+        liker_emojis = auth_manager.get_profile_emojis(likes['username']) if auth_manager else {}
         for _, like in likes.iterrows():
             col1, col2 = st.columns([1, 4])
             with col1:
-                display_profile_emoji(auth_manager, like['username'], size=40)
+                display_profile_emoji(auth_manager, like['username'], size=40, emoji=liker_emojis.get(like['username']))
             with col2:
                 st.write(f"**{like['username']}** · {like['created_at']}")
     else:
@@ -560,18 +875,18 @@ def post_detail_page(post_manager, current_username, auth_manager=None):
     with col1:
         liked = post_manager.user_liked_post(post_id, current_username)
         like_emoji = "❤️" if liked else "🤍"
-        if st.button(f"{like_emoji} 좋아요", key="detail_like", use_container_width=True):
+        if st.button(f"{like_emoji} 좋아요", key="detail_like", width='stretch'):
             post_manager.toggle_like(post_id, current_username)
             st.rerun()
     
     with col2:
-        if st.button("🔄 리포스트", key="detail_repost", use_container_width=True):
+        if st.button("🔄 리포스트", key="detail_repost", width='stretch'):
             st.session_state.show_detail_repost = True
             st.rerun()
     
     with col3:
         if post['username'] == current_username:
-            if st.button("🗑️ 삭제", key="detail_delete", use_container_width=True):
+            if st.button("🗑️ 삭제", key="detail_delete", width='stretch'):
                 st.session_state.show_detail_delete = True
                 st.rerun()
     
@@ -628,14 +943,24 @@ def display_posts_feed(post_manager, current_username, auth_manager=None):
         st.write("아직 게시물이 없습니다. 첫 번째 게시물을 작성해보세요!")
         return
     
-    for _, post in posts.iterrows():
-        display_post(post.to_dict(), post_manager, current_username, show_actions=True, auth_manager=auth_manager)
+    # 리포스트 원본 게시물을 한 번에 조회
+    original_posts = post_manager.get_posts_by_ids(posts['original_post_id'].dropna().tolist())
+    liked_post_ids = post_manager.liked_post_ids(current_username, posts['post_id'].tolist())
+    profile_emojis = auth_manager.get_profile_emojis(posts['username'].unique()) if auth_manager else None
+    
+    def render_post(post):
+        display_post(post, post_manager, current_username, show_actions=True,
+                     auth_manager=auth_manager, original_posts=original_posts, liked_post_ids=liked_post_ids,
+                     profile_emojis=profile_emojis)
+    
+    display_posts_window(posts, render_post, image_catalog=post_manager.image_catalog)
 
 
-def display_profile_emoji(auth_manager, username, size=50):
-    """프로필 이모지를 표시하는 공통 함수"""
-    if auth_manager:
-        emoji = auth_manager.get_user_profile_emoji(username)
+def display_profile_emoji(auth_manager, username, size=50, emoji=None):
+    """프로필 이모지를 표시하는 공통 함수 (emoji: 미리 조회한 이모지)"""
+    if emoji is not None or auth_manager:
+        if emoji is None:
+            emoji = auth_manager.get_user_profile_emoji(username)
         st.markdown(
             f"<div style='font-size: {size}px; text-align: center;'>{emoji}</div>",
             unsafe_allow_html=True
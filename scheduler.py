@@ -0,0 +1,211 @@
+# scheduler.py - 팩토리 자동 모니터링 (asyncio 이벤트 루프 기반 스케줄러)
+import asyncio
+import heapq
+import random
+import threading
+
+# 기본 설정
+DEFAULT_POLL_INTERVAL = 300  # 팩토리별 기본 점검 주기 (초)
+DEFAULT_JITTER = 0.1  # 점검 주기 흔들림 비율 (±10%)
+DEFAULT_MAX_CONCURRENCY = 4  # 동시에 실행하는 점검 배치 수 (갱신은 매니저 잠금으로 하나씩, 피드 알림만 겹침)
+DEFAULT_BATCH_SIZE = 256  # 한 번에 갱신하는 최대 팩토리 수
+DEFAULT_BATCH_WINDOW = 1.0  # 이 시간(초) 안에 예정된 점검은 한 배치로 묶음
+SUMMARY_INTERVAL = 3600  # 전체 요약 포스트 주기 (초)
+MAX_RETRY_DELAY = 300  # 점검 실패 시 최대 재시도 대기 (초)
+
+SUMMARY = None  # 힙에서 요약 포스트 마감을 나타내는 키
+
+
+class FactoryScheduler:
+    """팩토리마다 다음 점검 시각을 힙에 두고, 때가 된 팩토리만 묶어서 갱신하는 스케줄러
+
+    별도 스레드의 이벤트 루프에서 돌고, 실제 갱신은 동시 실행 수를 제한한 채 작업 스레드에서 실행
+    팩토리 갱신은 FactoryManager 잠금 안에서 배치 하나씩 진행되므로, max_concurrency는 한 배치의
+    피드 알림 작성과 다음 배치의 갱신을 겹치게 할 뿐 갱신 자체를 병렬로 돌리지는 않음
+    """
+
+    def __init__(self, factory_manager, post_manager, poll_interval=DEFAULT_POLL_INTERVAL,
+                 intervals=None, jitter=DEFAULT_JITTER, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 batch_size=DEFAULT_BATCH_SIZE, batch_window=DEFAULT_BATCH_WINDOW,
+                 summary_interval=SUMMARY_INTERVAL):
+        self.factory_manager = factory_manager
+        self.post_manager = post_manager
+        self.poll_interval = poll_interval
+        self.intervals = dict(intervals or {})  # factory_id -> 점검 주기 (없으면 poll_interval)
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.summary_interval = summary_interval
+        self.rng = random.Random()
+
+        self._heap = []  # (예정 시각, 순번, factory_id 또는 SUMMARY)
+        self._seq = 0
+        self._scheduled = set()  # 힙에 올라간 factory_id
+        self._failures = {}  # factory_id -> 연속 실패 횟수
+        self._loop = None
+        self._stop_event = None
+        self._wakeup = None
+        self.thread = None
+
+    def interval_for(self, factory_id):
+        """팩토리의 점검 주기 (초)"""
+        return self.intervals.get(factory_id, self.poll_interval)
+
+    def set_interval(self, factory_id, seconds):
+        """팩토리의 점검 주기 변경 (다음 점검부터 적용)"""
+        self.intervals[factory_id] = seconds
+
+    def _jittered(self, seconds):
+        """주기에 ±jitter 비율의 흔들림을 더한 값"""
+        return seconds * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _push(self, due, key):
+        heapq.heappush(self._heap, (due, self._seq, key))
+        self._seq += 1
+
+    def _schedule_new_factories(self, now):
+        """아직 힙에 없는 팩토리를 첫 주기 안에 고르게 흩어서 예약하고 현재 팩토리 ID 집합 반환"""
+        factory_ids = set(self.factory_manager.get_factory_ids())
+        for factory_id in factory_ids:
+            if factory_id not in self._scheduled:
+                self._scheduled.add(factory_id)
+                self._push(now + self.rng.uniform(0, self.interval_for(factory_id)), factory_id)
+        return factory_ids
+
+    def _pop_due(self, now, factory_ids):
+        """예정 시각이 지난(또는 batch_window 안에 다가온) 팩토리 ID 목록과 요약 마감 도달 여부
+
+        factory_ids: _schedule_new_factories가 잠금 안에서 읽어 둔 팩토리 ID 집합
+        """
+        due_factories = []
+        summary_due = False
+        while self._heap and self._heap[0][0] <= now + self.batch_window:
+            due, _, key = self._heap[0]
+            if key is SUMMARY and due > now:
+                # 요약은 마감 시각 전에는 당겨서 실행하지 않음
+                break
+            heapq.heappop(self._heap)
+            if key is SUMMARY:
+                summary_due = True
+                # 마감 시각 기준으로 다음 마감을 잡아서 주기가 밀리지 않게 함
+                self._push(max(due + self.summary_interval, now), SUMMARY)
+            elif key in factory_ids:
+                due_factories.append(key)
+            else:
+                # 삭제된 팩토리는 다시 예약하지 않음
+                self._scheduled.discard(key)
+        return due_factories, summary_due
+
+    def poll_factories(self, factory_ids):
+        """팩토리들을 한 번에 갱신하고 상태가 바뀐 팩토리는 소셜 피드에 알림 (작업 스레드에서 실행)"""
+        from factory_integration import post_status_changes
+
+        # 이전 상태도 갱신과 같은 잠금 안에서 읽어야 다른 세션의 수동 갱신과 섞이지 않음
+        old_statuses, new_statuses = self.factory_manager.update_factory_transitions(factory_ids)
+        post_status_changes(self.factory_manager, self.post_manager, old_statuses,
+                            {factory_id: status['status'] for factory_id, status in new_statuses.items()})
+        return new_statuses
+
+    def post_summary(self):
+        """전체 요약 포스트 생성 (작업 스레드에서 실행)"""
+        from factory_integration import create_factory_summary_post
+        return create_factory_summary_post(self.factory_manager, self.post_manager)
+
+    async def _run_batch(self, semaphore, factory_ids):
+        """동시 실행 제한 안에서 배치를 점검하고 팩토리별 다음 점검을 예약"""
+        async with semaphore:
+            try:
+                await asyncio.to_thread(self.poll_factories, factory_ids)
+                failed = False
+            except Exception as e:
+                print(f"모니터링 오류: {e}")
+                failed = True
+
+        now = self._loop.time()
+        for factory_id in factory_ids:
+            interval = self.interval_for(factory_id)
+            if failed:
+                # 실패한 팩토리는 짧게 시작해서 점점 길게 재시도 (최대 주기까지)
+                failures = self._failures.get(factory_id, 0) + 1
+                self._failures[factory_id] = failures
+                delay = min(interval, MAX_RETRY_DELAY, 5 * 2 ** (failures - 1))
+            else:
+                self._failures.pop(factory_id, None)
+                delay = interval
+            self._push(now + self._jittered(delay), factory_id)
+        self._wakeup.set()
+
+    async def _run_summary(self):
+        try:
+            await asyncio.to_thread(self.post_summary)
+        except Exception as e:
+            print(f"요약 포스트 오류: {e}")
+
+    async def run(self):
+        """중지 요청이 올 때까지 예정 시각에 맞춰 점검/요약 실행"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = set()
+
+        # 다시 시작해도 예약을 처음부터 잡음
+        self._heap = []
+        self._scheduled = set()
+        now = self._loop.time()
+        self._push(now + self.summary_interval, SUMMARY)
+
+        while not self._stop_event.is_set():
+            now = self._loop.time()
+            factory_ids = self._schedule_new_factories(now)
+            due_factories, summary_due = self._pop_due(now, factory_ids)
+
+            if summary_due:
+                task = asyncio.create_task(self._run_summary())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            for start in range(0, len(due_factories), self.batch_size):
+                task = asyncio.create_task(self._run_batch(semaphore, due_factories[start:start + self.batch_size]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            # 다음 예정 시각까지 대기 (배치가 끝나 새 예약이 생기거나 중지 요청이 오면 바로 깨어남)
+            timeout = max(0, self._heap[0][0] - self._loop.time()) if self._heap else None
+            self._wakeup.clear()
+            waiters = [asyncio.create_task(self._wakeup.wait()), asyncio.create_task(self._stop_event.wait())]
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+
+        # 진행 중인 점검은 끝까지 마무리
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def start(self):
+        """백그라운드 스레드에서 스케줄러 시작 (이미 실행 중이면 그대로)"""
+        if self.thread is not None and self.thread.is_alive():
+            return self.thread
+        started = threading.Event()
+
+        def run_loop():
+            async def main():
+                task = asyncio.create_task(self.run())
+                await asyncio.sleep(0)
+                started.set()
+                await task
+            asyncio.run(main())
+
+        self.thread = threading.Thread(target=run_loop, name='factory-scheduler', daemon=True)
+        self.thread.start()
+        started.wait()
+        return self.thread
+
+    def stop(self, timeout=None):
+        """중지 요청 후 진행 중인 점검이 끝날 때까지 대기"""
+        if self.thread is None:
+            return
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        self.thread.join(timeout)
+        self.thread = None
@@ -0,0 +1,278 @@
+# sharded_monitor.py - 팩토리를 여러 워커 프로세스에 나눠 시뮬레이션하는 모니터링 모드
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from fleet import FactoryFleet
+from sim_factory import Sim_Factory, status_message
+
+SUMMARY_INTERVAL = 3600  # 전체 요약 포스트 주기 (초)
+ROUND_TIMEOUT = 60  # 한 라운드 결과를 기다리는 최대 시간 (초)
+VALUE_NAMES = ('temp', 'pressure', 'rpm', 'count')
+
+
+def shard_for(factory_id, shards):
+    """factory_id가 속하는 샤드 번호 (프로세스를 다시 띄워도 같은 값)"""
+    return zlib.crc32(factory_id.encode('utf-8')) % shards
+
+
+def _add_factories(fleet, factories, rows):
+    """(factory_id, 이름) 행들을 워커의 fleet에 추가 (값은 매 단계 메인 프로세스에서 받음)"""
+    for factory_id, name in rows:
+        factories[factory_id] = Sim_Factory(name, fleet, fleet.add())
+
+
+def _evaluate_shard(fleet, factories, values, abnormal_rate):
+    """메인 프로세스의 현재 값에서 샤드 전체를 한 단계 진행하고 쓰기 스레드로 보낼 결과 묶음 생성"""
+    size = len(fleet)
+    for name in VALUE_NAMES:
+        getattr(fleet, name)[:size] = values[name]
+    fleet.set_status(None, values['status'])
+
+    fleet.step(None, abnormal_rate)
+    messages = []
+    status_data = []
+    for factory in factories.values():
+        messages.append(status_message(factory))
+        status_data.append(json.dumps(factory.current_status(), default=str))
+    new_values = {name: getattr(fleet, name)[:size].copy() for name in VALUE_NAMES}
+    new_values['status'] = fleet.status[:size].copy()
+    return {'factory_ids': list(factories), 'values': new_values, 'messages': messages, 'status_data': status_data}
+
+
+def run_shard(shard, seed, rows, commands, results):
+    """워커 프로세스 본체 - 명령 큐에서 ('step', (라운드, 비정상 확률, 현재 값)) / ('add', 행들) / ('stop', None)을 받아 처리"""
+    fleet = FactoryFleet(capacity=max(len(rows), 1), seed=seed)
+    factories = {}  # factory_id -> fleet 행 보기 (fleet 행 순서와 같음)
+    _add_factories(fleet, factories, rows)
+
+    while True:
+        command, payload = commands.get()
+        if command == 'stop':
+            break
+        if command == 'add':
+            _add_factories(fleet, factories, payload)
+        elif command == 'step':
+            round_id, abnormal_rate, values = payload
+            try:
+                results.put(('result', round_id, shard, _evaluate_shard(fleet, factories, values, abnormal_rate)))
+            except Exception as e:
+                results.put(('error', round_id, shard, str(e)))
+
+
+class ShardedFleetMonitor:
+    """factory_id 해시로 팩토리를 워커 프로세스에 나눠 갱신하고, 결과는 쓰기 스레드 하나가 매니저에 반영
+
+    워커는 매 단계 메인 프로세스의 현재 값을 받아 자기 샤드의 센서 값/상태/메시지를 계산하고,
+    공유 상태(팩토리 행, 센서 기록, 피드)는 쓰기 스레드만 변경
+    """
+
+    def __init__(self, factory_manager, post_manager=None, workers=None, abnormal_rate=0.15,
+                 seed=None, summary_interval=SUMMARY_INTERVAL, round_timeout=ROUND_TIMEOUT):
+        self.factory_manager = factory_manager
+        self.post_manager = post_manager  # 있으면 상태가 바뀐 팩토리를 소셜 피드에 알림
+        self.workers = workers or os.cpu_count() or 1
+        self.abnormal_rate = abnormal_rate
+        self.seed = seed
+        self.summary_interval = summary_interval
+        self.round_timeout = round_timeout
+
+        # 워커가 메인 프로세스를 fork하지 않도록 spawn으로 시작 (Streamlit 서버 스레드 복제 방지)
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = []
+        self._commands = []
+        self._results = None
+        self._shards = {}  # factory_id -> 샤드 번호
+        self._shard_ids = []  # 샤드 -> 워커 fleet 행 순서의 factory_id 목록
+        self._sent = {}  # (라운드, 샤드) -> 워커에 보낸 값 (결과 반영 시 그 뒤 바뀐 팩토리 확인용)
+        self._writer = None
+        self._driver = None
+        self._stop_event = threading.Event()
+
+        self._round = 0
+        self._pending = {}  # 라운드 -> 아직 결과가 오지 않은 샤드 수
+        self._updated = {}  # 라운드 -> 반영한 팩토리 수
+        self._round_done = threading.Condition()
+
+    def _factory_rows(self, factory_ids):
+        return [(factory_id, self.factory_manager.factories[factory_id].name) for factory_id in factory_ids]
+
+    def _start_worker(self, shard):
+        """샤드 워커 프로세스를 (다시) 시작"""
+        commands = self._context.Queue()
+        seed = None if self.seed is None else self.seed + shard
+        process = self._context.Process(
+            target=run_shard, args=(shard, seed, self._factory_rows(self._shard_ids[shard]), commands, self._results),
+            name=f'factory-shard-{shard}', daemon=True)
+        process.start()
+        self._commands[shard] = commands
+        self._processes[shard] = process
+
+    def start(self, interval=None):
+        """워커 프로세스와 쓰기 스레드 시작 (interval을 주면 그 주기(초)마다 라운드를 자동 실행)"""
+        if self._processes:
+            return self
+        self._stop_event.clear()
+
+        self._shard_ids = [[] for _ in range(self.workers)]
+        for factory_id in self.factory_manager.get_factory_ids():
+            shard = shard_for(factory_id, self.workers)
+            self._shards[factory_id] = shard
+            self._shard_ids[shard].append(factory_id)
+
+        self._results = self._context.Queue()
+        self._commands = [None] * self.workers
+        self._processes = [None] * self.workers
+        for shard in range(self.workers):
+            self._start_worker(shard)
+
+        self._writer = threading.Thread(target=self._write_results, name='factory-shard-writer', daemon=True)
+        self._writer.start()
+
+        if interval is not None:
+            self._driver = threading.Thread(target=self._drive, args=(interval,), name='factory-shard-driver',
+                                            daemon=True)
+            self._driver.start()
+        return self
+
+    def _restart_dead_workers(self):
+        """종료된 워커를 다시 시작 (값은 매 단계 보내므로 새 워커도 바로 이어서 계산)"""
+        for shard, process in enumerate(self._processes):
+            if not process.is_alive():
+                print(f"샤드 {shard} 워커가 종료되어 다시 시작합니다 (exitcode={process.exitcode})")
+                with self._round_done:
+                    for key in [key for key in self._sent if key[1] == shard]:
+                        del self._sent[key]
+                self._start_worker(shard)
+
+    def _add_new_factories(self):
+        """시작 후 추가된 팩토리를 해당 샤드 워커에 등록"""
+        new_ids = {}
+        for factory_id in self.factory_manager.get_factory_ids():
+            if factory_id not in self._shards:
+                shard = shard_for(factory_id, self.workers)
+                self._shards[factory_id] = shard
+                self._shard_ids[shard].append(factory_id)
+                new_ids.setdefault(shard, []).append(factory_id)
+        for shard, factory_ids in new_ids.items():
+            self._commands[shard].put(('add', self._factory_rows(factory_ids)))
+
+    def run_round(self, wait=True, timeout=None):
+        """모든 샤드를 한 단계 진행 (wait면 결과가 반영될 때까지 기다린 뒤 반영한 팩토리 수 반환)
+
+        timeout(기본 round_timeout)이 지나거나 워커가 종료되면 기다리지 않고 그때까지 반영한 수를 반환
+        """
+        self._restart_dead_workers()
+        self._add_new_factories()
+        with self._round_done:
+            self._round += 1
+            round_id = self._round
+            if wait:
+                # 기다리는 라운드만 도착한 샤드 수를 셈
+                self._pending[round_id] = len(self._commands)
+                self._updated[round_id] = 0
+        for shard, commands in enumerate(self._commands):
+            # 메인 프로세스에서 바뀐 값(수동 갱신 등)을 매 단계 워커에 다시 보냄
+            values = self.factory_manager.get_factory_values(self._shard_ids[shard])
+            with self._round_done:
+                self._sent[(round_id, shard)] = values
+            commands.put(('step', (round_id, self.abnormal_rate, values)))
+        if not wait:
+            return None
+
+        deadline = time.monotonic() + (self.round_timeout if timeout is None else timeout)
+        with self._round_done:
+            while self._pending.get(round_id, 0) > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"라운드 {round_id} 결과를 기다리다 시간 초과")
+                    break
+                if not all(process.is_alive() for process in self._processes):
+                    print(f"라운드 {round_id} 도중 워커가 종료됨")
+                    break
+                self._round_done.wait(min(remaining, 1.0))
+            self._pending.pop(round_id, None)
+            return self._updated.pop(round_id, 0)
+
+    def _write_results(self):
+        """쓰기 스레드 - 샤드 결과 묶음이 도착하는 대로 매니저와 피드에 반영"""
+        from factory_integration import post_status_changes
+
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+            kind, round_id, shard, payload = message
+            with self._round_done:
+                expected = self._sent.pop((round_id, shard), None)
+            updated = 0
+            if kind == 'error':
+                print(f"샤드 {shard} 모니터링 오류: {payload}")
+            elif expected is not None:
+                try:
+                    updated = self._apply(payload, expected, post_status_changes)
+                except Exception as e:
+                    print(f"샤드 {shard} 결과 반영 오류: {e}")
+
+            with self._round_done:
+                if round_id in self._pending:
+                    self._pending[round_id] -= 1
+                    self._updated[round_id] += updated
+                self._round_done.notify_all()
+
+    def _apply(self, payload, expected, post_status_changes):
+        """결과 묶음 하나를 매니저에 반영하고 반영한 팩토리 수 반환 (보낸 뒤 바뀐 팩토리는 건너뜀)"""
+        old_statuses, new_statuses = self.factory_manager.apply_factory_results(
+            payload['factory_ids'], payload['values'], payload['messages'], payload['status_data'], expected)
+
+        if self.post_manager is not None:
+            post_status_changes(self.factory_manager, self.post_manager, old_statuses, new_statuses)
+        return len(new_statuses)
+
+    def _drive(self, interval):
+        """interval마다 라운드 실행, 요약 포스트는 마감 시각에 맞춰 생성"""
+        next_summary = time.monotonic() + self.summary_interval
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.run_round()
+            except Exception as e:
+                print(f"모니터링 오류: {e}")
+
+            if self.post_manager is not None and time.monotonic() >= next_summary:
+                from factory_integration import create_factory_summary_post
+                try:
+                    create_factory_summary_post(self.factory_manager, self.post_manager)
+                except Exception as e:
+                    print(f"요약 포스트 오류: {e}")
+                next_summary += self.summary_interval
+
+            # 라운드에 걸린 시간만큼 빼고 대기 (주기가 밀리지 않게)
+            self._stop_event.wait(max(0, interval - (time.monotonic() - started)))
+
+    def stop(self, timeout=10):
+        """자동 실행을 멈추고 워커 프로세스와 쓰기 스레드 종료 (도착한 결과는 모두 반영)"""
+        self._stop_event.set()
+        if self._driver is not None:
+            self._driver.join(timeout)
+            self._driver = None
+        for commands in self._commands:
+            commands.put(('stop', None))
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._results is not None:
+            self._results.put(None)
+        if self._writer is not None:
+            self._writer.join(timeout)
+
+        self._processes = []
+        self._commands = []
+        self._results = None
+        self._shards = {}
+        self._shard_ids = []
+        self._sent = {}
+        self._writer = None
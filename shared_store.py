@@ -0,0 +1,37 @@
+# shared_store.py - 서버 프로세스 단위로 공유되는 매니저 저장소
+import os
+import streamlit as st
+from auth import AuthManager
+from post import PostManager
+from follow import FollowManager
+from factory_manager import FactoryManager
+
+# 저장 방식: 'csv' (기본), 'wal' (게시물 변경 로그), 'sqlite'
+STORAGE_BACKEND = os.environ.get('MY_SOCIAL_FEED_STORAGE', 'csv')
+
+
+class SharedManagers:
+    """모든 세션이 함께 쓰는 매니저 묶음"""
+
+    def __init__(self, storage='csv'):
+        self.storage = storage
+
+        if storage == 'sqlite':
+            from sqlite_backend import (SQLiteStore, SQLiteAuthManager, SQLitePostManager,
+                                        SQLiteFollowManager, SQLiteFactoryManager)
+            store = SQLiteStore()
+            self.auth_manager = SQLiteAuthManager(store)
+            self.post_manager = SQLitePostManager(store)
+            self.follow_manager = SQLiteFollowManager(store)
+            self.factory_manager = SQLiteFactoryManager(store)
+        else:
+            self.auth_manager = AuthManager()
+            self.post_manager = PostManager(storage_mode=storage)
+            self.follow_manager = FollowManager()
+            self.factory_manager = FactoryManager()
+
+
+@st.cache_resource(show_spinner=False)
+def get_shared_managers(storage=STORAGE_BACKEND):
+    """서버 프로세스당 한 번만 데이터를 읽어 모든 세션이 공유하는 매니저 반환"""
+    return SharedManagers(storage)
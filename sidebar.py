@@ -1,11 +1,13 @@
 # sidebar.py (수정된 버전)
 import streamlit as st
+import pandas as pd
 from post import display_post
+from enhanced_post_display import mark_touched
 from datetime import datetime
 import os
 
-def sidebar_navigation():
-    """사이드바 네비게이션 메뉴"""
+def sidebar_navigation(factory_manager=None):
+    """사이드바 네비게이션 메뉴 (factory_manager: 공유 팩토리 매니저)"""
     st.sidebar.title("📱 소셜 서비스")
     st.sidebar.write(f"👋 {st.session_state.username}님")
     st.sidebar.write("---")
@@ -29,19 +31,20 @@ def sidebar_navigation():
         else:
             button_type = "secondary"
             
-        if st.sidebar.button(label, use_container_width=True, key=f"nav_{page_key}", type=button_type):
+        if st.sidebar.button(label, width='stretch', key=f"nav_{page_key}", type=button_type):
             st.session_state.current_page = page_key
             st.rerun()
     
     st.sidebar.write("---")
     
     # 팩토리 빠른 상태 (사이드바)
-    display_factory_quick_status()
+    if factory_manager is not None:
+        display_factory_quick_status(factory_manager)
     
     st.sidebar.write("---")
     
     # 로그아웃 버튼
-    if st.sidebar.button("🚪 로그아웃", use_container_width=True):
+    if st.sidebar.button("🚪 로그아웃", width='stretch'):
         st.session_state.logged_in = False
         st.session_state.username = ''
         st.session_state.show_signup = False
@@ -54,45 +57,40 @@ def sidebar_navigation():
     
     return current_page
 
-def display_factory_quick_status():
-    """사이드바에 팩토리 빠른 상태 표시"""
+def display_factory_quick_status(factory_manager):
+    """사이드바에 팩토리 빠른 상태 표시 (공유 매니저의 요약 스냅샷을 읽기만 함)"""
     try:
-        # factory_manager가 있는지 확인
-        if 'factory_manager' in globals() or hasattr(st.session_state, 'factory_manager'):
-            from factory_manager import FactoryManager
-            factory_manager = FactoryManager()
-            
-            summary = factory_manager.get_factory_summary()
+        summary = factory_manager.get_fleet_snapshot()
+        
+        if summary['total_factories'] > 0:
+            st.sidebar.subheader("🏭 팩토리 현황")
             
-            if summary['total_factories'] > 0:
-                st.sidebar.subheader("🏭 팩토리 현황")
-                
-                # 상태별 개수 표시
-                col1, col2 = st.sidebar.columns(2)
-                with col1:
-                    st.sidebar.metric("정상", summary['normal_count'])
-                    st.sidebar.metric("경고", summary['warning_count'])
-                with col2:
-                    st.sidebar.metric("위험", summary['error_count'])
-                
-                # 위험 상황 알림
-                if summary['error_count'] > 0:
-                    st.sidebar.error(f"🚨 {summary['error_count']}개 팩토리 위험!")
-                elif summary['warning_count'] > 0:
-                    st.sidebar.warning(f"⚠️ {summary['warning_count']}개 팩토리 주의")
-                else:
-                    st.sidebar.success("✅ 모든 팩토리 정상")
-                
-                # 빠른 액션 버튼
-                if st.sidebar.button("🔄 상태 업데이트", key="sidebar_update"):
-                    for factory_id in factory_manager.factories.keys():
-                        factory_manager.update_factory_status(factory_id)
-                    st.sidebar.success("업데이트 완료!")
-                    st.rerun()
+            # 상태별 개수 표시
+            col1, col2 = st.sidebar.columns(2)
+            with col1:
+                st.sidebar.metric("정상", summary['normal_count'])
+                st.sidebar.metric("경고", summary['warning_count'])
+            with col2:
+                st.sidebar.metric("위험", summary['error_count'])
+            st.sidebar.caption(f"🕒 {summary['updated_at'].strftime('%H:%M:%S')} 기준")
             
+            # 위험 상황 알림
+            if summary['error_count'] > 0:
+                st.sidebar.error(f"🚨 {summary['error_count']}개 팩토리 위험!")
+            elif summary['warning_count'] > 0:
+                st.sidebar.warning(f"⚠️ {summary['warning_count']}개 팩토리 주의")
             else:
-                st.sidebar.info("등록된 팩토리가 없습니다.")
-                
+                st.sidebar.success("✅ 모든 팩토리 정상")
+            
+            # 빠른 액션 버튼
+            if st.sidebar.button("🔄 상태 업데이트", key="sidebar_update"):
+                factory_manager.update_all_factories()
+                st.sidebar.success("업데이트 완료!")
+                st.rerun()
+        
+        else:
+            st.sidebar.info("등록된 팩토리가 없습니다.")
+            
     except Exception as e:
         st.sidebar.write("팩토리 상태 로딩 중...")
 
@@ -107,8 +105,8 @@ def profile_page(auth_manager, post_manager, follow_manager, username):
     else:
         st.title(f"👤 {username}님의 프로필")
     
-    user_info = auth_manager.df[auth_manager.df['username'] == username]
-    user_id = user_info['id'].iloc[0] if len(user_info) > 0 else None
+    user_info = auth_manager.get_user(username)
+    user_id = user_info['id'] if user_info is not None else None
 
     # 사용자 정보
     col1, col2 = st.columns([1, 3])
@@ -123,16 +121,15 @@ def profile_page(auth_manager, post_manager, follow_manager, username):
         st.subheader(f"@{username}")
         
         # 가입일 정보
-        user_info = auth_manager.df[auth_manager.df['username'] == username]
-        if len(user_info) > 0:
-            joined_date = user_info['created_at'].iloc[0]
+        if user_info is not None:
+            joined_date = user_info['created_at']
             st.write(f"📅 가입일: {joined_date}")
             
     if not is_my_profile and user_id: 
         current_user_id = auth_manager.get_user_id(st.session_state.username)
         if current_user_id:
             if follow_manager.is_following(current_user_id, user_id):
-                if st.button("언팔로우", key=f"unfollow_{user_id}", use_container_width=True):
+                if st.button("언팔로우", key=f"unfollow_{user_id}", width='stretch'):
                     success, message = follow_manager.unfollow_user(current_user_id, user_id)
                     if success:
                         st.success(message)
@@ -140,7 +137,7 @@ def profile_page(auth_manager, post_manager, follow_manager, username):
                     else:
                         st.error(message)
             else:
-                if st.button("팔로우", key=f"follow_{user_id}", type="primary", use_container_width=True):
+                if st.button("팔로우", key=f"follow_{user_id}", type="primary", width='stretch'):
                     success, message = follow_manager.follow_user(current_user_id, user_id)
                     if success:
                         st.success(message)
@@ -151,7 +148,7 @@ def profile_page(auth_manager, post_manager, follow_manager, username):
     st.write("---")
 
     # 통계 정보
-    user_posts = post_manager.posts_df[post_manager.posts_df['username'] == username]
+    user_posts = post_manager.get_user_posts(username)
     total_posts = len(user_posts)
     total_likes_received = user_posts['like_count'].sum()
     total_reposts_received = user_posts['repost_count'].sum()
@@ -205,9 +202,11 @@ def profile_page(auth_manager, post_manager, follow_manager, username):
                 if new_password and confirm_password:
                     if new_password == confirm_password:
                         # 비밀번호 업데이트
-                        auth_manager.df.loc[auth_manager.df['username'] == username, 'password'] = new_password
-                        auth_manager.save_users()
-                        st.success("비밀번호가 변경되었습니다!")
+                        success, message = auth_manager.update_password(username, new_password)
+                        if success:
+                            st.success(message)
+                        else:
+                            st.error(message)
                     else:
                         st.error("비밀번호가 일치하지 않습니다.")
                 else:
@@ -218,8 +217,7 @@ def my_posts_page(post_manager, username, auth_manager=None):
     st.title("📝 내 게시물")
     
     # 내 게시물 조회
-    my_posts = post_manager.posts_df[post_manager.posts_df['username'] == username]
-    my_posts = my_posts.sort_values('created_at', ascending=False)
+    my_posts = post_manager.get_user_posts(username)
     
     if len(my_posts) == 0:
         st.write("아직 작성한 게시물이 없습니다.")
@@ -242,16 +240,16 @@ def my_posts_page(post_manager, username, auth_manager=None):
     st.write("---")
     
     # 게시물 목록 (삭제 기능 포함)
+    profile_emoji = auth_manager.get_user_profile_emoji(username) if auth_manager else None
     for _, post in my_posts.iterrows():
-        display_my_post_with_delete(post.to_dict(), post_manager, username, auth_manager)
+        display_my_post_with_delete(post.to_dict(), post_manager, username, auth_manager, profile_emoji)
 
 def liked_posts_page(post_manager, username, auth_manager=None):
     """좋아요한 게시물 페이지"""
     st.title("❤️ 좋아요한 게시물")
     
     # 사용자가 좋아요한 게시물 ID들 조회
-    user_likes = post_manager.likes_df[post_manager.likes_df['username'] == username]
-    user_likes = user_likes.sort_values('created_at', ascending=False)
+    user_likes = post_manager.get_user_likes(username)
     
     if len(user_likes) == 0:
         st.write("아직 좋아요한 게시물이 없습니다.")
@@ -261,25 +259,35 @@ def liked_posts_page(post_manager, username, auth_manager=None):
     st.write(f"총 {len(user_likes)}개의 게시물에 좋아요를 눌렀습니다.")
     st.write("---")
     
+    from enhanced_post_display import display_enhanced_post
+    
+    # 좋아요한 게시물과 리포스트 원본을 한 번에 조회
+    liked_posts = post_manager.get_posts_by_ids(user_likes['post_id'].tolist())
+    original_ids = [p['original_post_id'] for p in liked_posts.values() if pd.notna(p.get('original_post_id'))]
+    original_posts = post_manager.get_posts_by_ids(original_ids)
+    liked_post_ids = set(liked_posts.keys())
+    profile_emojis = auth_manager.get_profile_emojis({p['username'] for p in liked_posts.values()}) if auth_manager else None
+    
     # 좋아요한 게시물들 표시
     for _, like in user_likes.iterrows():
         post_id = like['post_id']
         liked_date = like['created_at']
         
         # 해당 게시물 조회
-        post = post_manager.get_post_by_id(post_id)
+        post = liked_posts.get(post_id)
         if post:
             # 좋아요 누른 날짜 표시
             st.caption(f"좋아요 누른 날짜: {liked_date}")
             
-            from enhanced_post_display import display_enhanced_post
-            display_enhanced_post(post, post_manager, username, show_actions=True, auth_manager=auth_manager)
+            display_enhanced_post(post, post_manager, username, show_actions=True,
+                                  auth_manager=auth_manager, original_posts=original_posts,
+                                  liked_post_ids=liked_post_ids, profile_emojis=profile_emojis)
         else:
             st.write("*삭제된 게시물입니다.*")
             st.write("---")
 
-def display_my_post_with_delete(post, post_manager, username, auth_manager=None):
-    """내 게시물 표시 (삭제 기능 포함)"""
+def display_my_post_with_delete(post, post_manager, username, auth_manager=None, profile_emoji=None):
+    """내 게시물 표시 (삭제 기능 포함, profile_emoji: 미리 조회한 작성자 이모지)"""
     # 게시물 컨테이너에 스타일 적용
     st.markdown("""
     <div style="
@@ -297,8 +305,9 @@ def display_my_post_with_delete(post, post_manager, username, auth_manager=None)
     
     with col1:
         # 프로필 이모지 표시
-        if auth_manager:
-            profile_emoji = auth_manager.get_user_profile_emoji(post['username'])
+        if profile_emoji is not None or auth_manager:
+            if profile_emoji is None:
+                profile_emoji = auth_manager.get_user_profile_emoji(post['username'])
             st.markdown(f"<div style='font-size: 50px; text-align: center;'>{profile_emoji}</div>", 
                        unsafe_allow_html=True)
         else:
@@ -384,43 +393,64 @@ def all_users_page(auth_manager, post_manager, follow_manager):
     if len(all_users) == 0:
         st.write("아직 다른 사용자가 없습니다.")
         return
+    
+    # 목록 전체의 팔로워 수와 팔로우 여부를 한 번에 조회
+    user_ids = all_users['id'].tolist()
+    follower_counts = follow_manager.follower_counts(user_ids)
+    following_ids = follow_manager.following_among(current_user_id, user_ids)
         
-    for _, user in all_users.iterrows():
-        col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
-        
-        with col1:
-            st.markdown(f"<div style='font-size: 50px; text-align: center;'>{user['profile_emoji']}</div>", 
-                       unsafe_allow_html=True)
-                       
-        with col2:
-            st.subheader(f"@{user['username']}")
-            # 통계 정보
-            follower_count = follow_manager.get_follower_count(user['id'])
-            st.caption(f"팔로워: {follower_count}")
+    for user in all_users.to_dict('records'):
+        display_user_row(user, follow_manager, current_user_id,
+                         follower_counts.get(user['id'], 0), user['id'] in following_ids)
+    st.write("---")
+
+@st.fragment
+def display_user_row(user, follow_manager, current_user_id, follower_count, following):
+    """사용자 목록의 한 줄 (팔로우 버튼을 누르면 이 줄만 다시 실행)"""
+    # 조각 재실행 때는 처음 호출 인자가 그대로 들어오므로 이 세션에서 바꾼 관계는 다시 조회
+    if user['id'] in st.session_state.get('touched_users', set()):
+        follower_count = follow_manager.get_follower_count(user['id'])
+        following = follow_manager.is_following(current_user_id, user['id'])
+    
+    col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
+    
+    with col1:
+        st.markdown(f"<div style='font-size: 50px; text-align: center;'>{user['profile_emoji']}</div>", 
+                   unsafe_allow_html=True)
+                   
+    with col2:
+        st.subheader(f"@{user['username']}")
+        # 통계 정보
+        st.caption(f"팔로워: {follower_count}")
+    
+    with col3:
+        # 프로필 보기 버튼
+        if st.button("프로필 보기", key=f"view_profile_{user['id']}"):
+            st.session_state.current_page = 'view_profile'
+            st.session_state.target_user_id = user['id']
+            st.rerun()
+
+    with col4:
+        # 팔로우/언팔로우 버튼 (콜백으로 처리되어 이 줄만 다시 그려짐)
+        if following:
+            st.button("언팔로우", key=f"unfollow_list_{user['id']}",
+                      on_click=follow_clicked, args=(follow_manager, current_user_id, user['id'], False))
+        else:
+            st.button("팔로우", key=f"follow_list_{user['id']}", type="primary",
+                      on_click=follow_clicked, args=(follow_manager, current_user_id, user['id'], True))
         
-        with col3:
-            # 프로필 보기 버튼
-            if st.button("프로필 보기", key=f"view_profile_{user['id']}"):
-                st.session_state.current_page = 'view_profile'
-                st.session_state.target_user_id = user['id']
-                st.rerun()
+        message = st.session_state.pop(f"follow_error_{user['id']}", None)
+        if message:
+            st.error(message)
 
-        with col4:
-            # 팔로우/언팔로우 버튼
-            if follow_manager.is_following(current_user_id, user['id']):
-                if st.button("언팔로우", key=f"unfollow_list_{user['id']}"):
-                    success, message = follow_manager.unfollow_user(current_user_id, user['id'])
-                    if success:
-                        st.success(message)
-                        st.rerun()
-                    else:
-                        st.error(message)
-            else:
-                if st.button("팔로우", key=f"follow_list_{user['id']}", type="primary"):
-                    success, message = follow_manager.follow_user(current_user_id, user['id'])
-                    if success:
-                        st.success(message)
-                        st.rerun()
-                    else:
-                        st.error(message)
-    st.write("---")
\ No newline at end of file
+def follow_clicked(follow_manager, follower_id, followed_id, follow):
+    """팔로우/언팔로우 버튼 콜백"""
+    if follow:
+        success, message = follow_manager.follow_user(follower_id, followed_id)
+    else:
+        success, message = follow_manager.unfollow_user(follower_id, followed_id)
+    
+    if success:
+        mark_touched('touched_users', followed_id)
+    else:
+        st.session_state[f"follow_error_{followed_id}"] = message
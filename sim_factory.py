@@ -1,44 +1,100 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
+from fleet import FactoryFleet, STATUSES, STATUS_CODES, BASE_TEMP, BASE_PRESSURE, BASE_RPM, BASE_PRODUCT
+
+STATUS_EMOJIS = {
+    'normal': '✅',
+    'overheat': '🔥',
+    'low_pressure': '⚠️',
+    'rpm_issue': '⚙️'
+}
+
+
+def status_message(factory):
+    """상태에 따른 메시지 생성"""
+    emoji = STATUS_EMOJIS.get(factory.status, '❓')
+    
+    if factory.status == 'normal':
+        return f"{emoji} {factory.name} 정상 운영 중 (온도: {factory.temp:.1f}°C, 압력: {factory.pressure:.1f}bar)"
+    elif factory.status == 'overheat':
+        return f"{emoji} {factory.name} 과열 경고! 온도가 {factory.temp:.1f}°C로 상승했습니다"
+    elif factory.status == 'low_pressure':
+        return f"{emoji} {factory.name} 압력 부족! 현재 압력: {factory.pressure:.1f}bar"
+    elif factory.status == 'rpm_issue':
+        return f"{emoji} {factory.name} 속도 문제 발생! 현재 RPM: {factory.rpm:.1f}"
+    else:
+        return f"{emoji} {factory.name} 상태 점검 필요"
+
 
 class Sim_Factory:
-    def __init__(self, name):
+    """FactoryFleet의 한 행을 보여주는 팩토리 객체 (값은 fleet 배열에 저장됨)"""
+    base_temp = BASE_TEMP  # 기본 온도 (°C)
+    base_pressure = BASE_PRESSURE  # 기본 압력 (bar)
+    base_rpm = BASE_RPM  # 기본 속도 (rpm)
+    base_product = BASE_PRODUCT  # 시간당 생산량
+    
+    def __init__(self, name, fleet=None, row=None):
         self.name = name
-        self.base_temp = 180  # 기본 온도 (°C)
-        self.base_pressure = 150  # 기본 압력 (bar)
-        self.base_rpm = 50  # 기본 속도 (rpm)
-        self.base_product = 100 # 시간당 생산량
-        self.status = 'normal'
-        
-        # 인스턴스 변수로 초기화
-        self.temp = self.base_temp
-        self.pressure = self.base_pressure
-        self.rpm = self.base_rpm
-        self.count = self.base_product
+        # fleet 없이 만들면 혼자 쓰는 한 행짜리 fleet 생성
+        self.fleet = fleet if fleet is not None else FactoryFleet(capacity=1)
+        self.row = row if row is not None else self.fleet.add()
+    
+    @property
+    def temp(self):
+        return float(self.fleet.temp[self.row])
+    
+    @temp.setter
+    def temp(self, value):
+        self.fleet.temp[self.row] = value
+    
+    @property
+    def pressure(self):
+        return float(self.fleet.pressure[self.row])
+    
+    @pressure.setter
+    def pressure(self, value):
+        self.fleet.pressure[self.row] = value
+    
+    @property
+    def rpm(self):
+        return float(self.fleet.rpm[self.row])
+    
+    @rpm.setter
+    def rpm(self, value):
+        self.fleet.rpm[self.row] = value
+    
+    @property
+    def count(self):
+        return float(self.fleet.count[self.row])
+    
+    @count.setter
+    def count(self, value):
+        self.fleet.count[self.row] = value
+    
+    @property
+    def status(self):
+        return STATUSES[self.fleet.status[self.row]]
+    
+    @status.setter
+    def status(self, value):
+        self.fleet.set_status([self.row], STATUS_CODES[value])
+    
+    @property
+    def location(self):
+        return self.fleet.locations[self.fleet.location[self.row]]
+    
+    @location.setter
+    def location(self, value):
+        self.fleet.set_location(self.row, value)
     
     def generate_normal_data(self):
         """정상 운영 데이터 생성"""
-        self.temp = self.base_temp + random.uniform(-5, 5)
-        self.pressure = self.base_pressure + random.uniform(-5, 5)
-        self.rpm = self.base_rpm + random.uniform(-2, 2)
-        self.count = self.base_product + random.uniform(-5, 5)
-        self.status = 'normal'
+        self.fleet.generate_normal([self.row])
 
     def abnormal_data(self):
         """비정상 데이터 생성"""
-        abnormal_type = random.choice(['overheat', 'low_pressure', 'rpm_issue'])
-
-        if abnormal_type == 'overheat':
-            self.temp = self.temp + random.uniform(30, 60)
-            self.status = 'overheat'
-        elif abnormal_type == 'low_pressure':
-            self.pressure = self.pressure - random.uniform(15, 30)  # 범위 수정
-            self.status = 'low_pressure'
-        elif abnormal_type == 'rpm_issue':
-            self.rpm = self.rpm - random.uniform(15, 25)  # 범위 수정
-            self.status = 'rpm_issue'
+        self.fleet.apply_abnormal([self.row])
 
     def current_status(self):
         """현재 상태 출력"""
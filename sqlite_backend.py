@@ -0,0 +1,694 @@
+# sqlite_backend.py - SQLite 저장소 (선택)
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from auth import AuthManager, PROFILE_EMOJIS
+from post import PostManager, classify_post
+from image_pipeline import ImageCatalog
+from follow import FollowManager
+from factory_manager import FactoryManager
+from locking import new_lock
+from timeline import encode_cursor, decode_cursor
+
+# users.id, posts.post_id, likes.like_id 는 INTEGER PRIMARY KEY (rowid 인덱스)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT,
+    created_at TEXT,
+    profile_emoji TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username);
+
+CREATE TABLE IF NOT EXISTS posts (
+    post_id INTEGER PRIMARY KEY,
+    username TEXT,
+    content TEXT,
+    created_at TEXT,
+    is_repost INTEGER DEFAULT 0,
+    original_post_id INTEGER,
+    like_count INTEGER DEFAULT 0,
+    repost_count INTEGER DEFAULT 0,
+    has_image INTEGER DEFAULT 0,
+    image_path TEXT,
+    post_kind TEXT,
+    priority TEXT,
+    image_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created_at ON posts(created_at);
+CREATE INDEX IF NOT EXISTS idx_posts_username_created_at ON posts(username, created_at);
+CREATE INDEX IF NOT EXISTS idx_posts_original_post_id ON posts(original_post_id);
+CREATE INDEX IF NOT EXISTS idx_posts_image_path ON posts(image_path);
+
+CREATE TABLE IF NOT EXISTS likes (
+    like_id INTEGER PRIMARY KEY,
+    post_id INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_likes_post_user ON likes(post_id, username);
+CREATE INDEX IF NOT EXISTS idx_likes_username ON likes(username);
+
+CREATE TABLE IF NOT EXISTS followers (
+    follower_id INTEGER NOT NULL,
+    followed_id INTEGER NOT NULL,
+    PRIMARY KEY (follower_id, followed_id)
+);
+CREATE INDEX IF NOT EXISTS idx_followers_followed ON followers(followed_id);
+
+CREATE TABLE IF NOT EXISTS factories (
+    factory_id TEXT PRIMARY KEY,
+    factory_name TEXT,
+    location TEXT,
+    created_at TEXT,
+    last_temp REAL,
+    last_pressure REAL,
+    last_rpm REAL,
+    last_product_count REAL,
+    last_status TEXT,
+    last_update TEXT
+);
+
+CREATE TABLE IF NOT EXISTS factory_posts (
+    post_id INTEGER PRIMARY KEY,
+    factory_id TEXT,
+    factory_name TEXT,
+    message TEXT,
+    status_data TEXT,
+    priority TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_factory_posts_created_at ON factory_posts(created_at);
+"""
+
+POST_COLUMNS = [
+    'post_id', 'username', 'content', 'created_at',
+    'is_repost', 'original_post_id', 'like_count', 'repost_count',
+    'has_image', 'image_path', 'post_kind', 'priority', 'image_status'
+]
+
+# 분류/이미지 상태 컬럼이 추가되기 전에 만들어진 DB에 붙일 컬럼과 인덱스
+POST_COLUMN_MIGRATION = [
+    ("post_kind", "ALTER TABLE posts ADD COLUMN post_kind TEXT"),
+    ("priority", "ALTER TABLE posts ADD COLUMN priority TEXT"),
+    ("image_status", "ALTER TABLE posts ADD COLUMN image_status TEXT"),
+]
+POST_KIND_INDEX = "CREATE INDEX IF NOT EXISTS idx_posts_kind_created_at ON posts(post_kind, created_at)"
+
+
+def _to_builtin(value):
+    """numpy 스칼라와 NaN을 sqlite3가 받을 수 있는 값으로 변환"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class SQLiteStore:
+    """모든 매니저가 공유하는 SQLite 연결"""
+
+    def __init__(self, db_path='social_feed.db'):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        # Streamlit 세션 스레드들이 같은 연결을 공유하므로 잠금으로 직렬화
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self._migrate_post_columns()
+
+    def _migrate_post_columns(self):
+        """예전 DB에 post_kind/priority/image_status 컬럼을 추가하고 비어 있는 행 분류"""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(posts)")}
+        for column, ddl in POST_COLUMN_MIGRATION:
+            if column not in columns:
+                self.conn.execute(ddl)
+        self.conn.execute(POST_KIND_INDEX)
+
+        rows = self.conn.execute(
+            "SELECT post_id, content, is_repost FROM posts WHERE post_kind IS NULL"
+        ).fetchall()
+        if rows:
+            updates = [classify_post(row['content'], bool(row['is_repost'])) + (row['post_id'],) for row in rows]
+            with self.transaction() as conn:
+                conn.executemany("UPDATE posts SET post_kind = ?, priority = ? WHERE post_id = ?", updates)
+
+    def execute(self, sql, params=()):
+        """쓰기 쿼리 실행 후 변경된 행 수 반환"""
+        with self.lock:
+            cursor = self.conn.execute(sql, [_to_builtin(p) for p in params])
+            return cursor.rowcount
+
+    def executemany(self, sql, rows):
+        """여러 행을 한 트랜잭션으로 기록"""
+        with self.transaction():
+            self.conn.executemany(sql, [[_to_builtin(v) for v in row] for row in rows])
+
+    @contextmanager
+    def transaction(self):
+        """여러 쿼리를 하나의 트랜잭션으로 묶기"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        """조회 결과를 dict 목록으로 반환"""
+        with self.lock:
+            rows = self.conn.execute(sql, [_to_builtin(p) for p in params]).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_one(self, sql, params=()):
+        """조회 결과 첫 행을 dict로 반환 (없으면 None)"""
+        rows = self.query(sql, params)
+        return rows[0] if rows else None
+
+    def read_frame(self, sql, params=()):
+        """조회 결과를 DataFrame으로 반환"""
+        with self.lock:
+            return pd.read_sql_query(sql, self.conn, params=[_to_builtin(p) for p in params])
+
+
+class SQLiteAuthManager(AuthManager):
+    """users 테이블을 인덱스 조회로 사용하는 AuthManager"""
+
+    def __init__(self, store):
+        self._lock = new_lock()
+        self.store = store
+        self.csv_file = None
+        self.profile_emojis = list(PROFILE_EMOJIS)
+
+    @property
+    def df(self):
+        """전체 사용자 테이블 (목록 화면 호환용)"""
+        return self.load_users()
+
+    def load_users(self):
+        """users 테이블 로드"""
+        return self.store.read_frame("SELECT * FROM users ORDER BY id")
+
+    def save_users(self):
+        """쓰기는 즉시 반영되므로 별도 저장 없음"""
+        pass
+
+    def get_user(self, username):
+        """사용자명으로 사용자 정보 조회"""
+        return self.store.query_one("SELECT * FROM users WHERE username = ?", (username,))
+
+    def get_user_by_id(self, user_id):
+        """ID로 사용자 정보 조회"""
+        return self.store.query_one("SELECT * FROM users WHERE id = ?", (user_id,))
+
+    def get_profile_emojis(self, usernames):
+        """여러 사용자의 프로필 이모지를 한 번에 조회 (username -> 이모지)"""
+        usernames = list(usernames)
+        if not usernames:
+            return {}
+        rows = self.store.query(
+            f"SELECT username, profile_emoji FROM users WHERE username IN ({', '.join('?' * len(usernames))})",
+            usernames
+        )
+        found = {row['username']: row['profile_emoji'] for row in rows}
+        return {username: self._valid_emoji(found.get(username)) for username in usernames}
+
+    def get_next_id(self):
+        """새로운 사용자 ID 생성"""
+        row = self.store.query_one("SELECT COALESCE(MAX(id), 0) + 1 AS next_id FROM users")
+        return row['next_id']
+
+    def _insert_user(self, user):
+        """사용자 추가"""
+        self.store.execute(
+            "INSERT INTO users (id, username, password, created_at, profile_emoji) VALUES (?, ?, ?, ?, ?)",
+            (user['id'], user['username'], user['password'], user['created_at'], user['profile_emoji'])
+        )
+
+    def _update_user(self, username, **fields):
+        """사용자 정보 변경"""
+        for column, value in fields.items():
+            if column not in ('password', 'profile_emoji'):
+                raise ValueError(f"변경할 수 없는 컬럼입니다: {column}")
+            self.store.execute(f"UPDATE users SET {column} = ? WHERE username = ?", (value, username))
+
+
+class SQLitePostManager(PostManager):
+    """posts/likes 테이블을 인덱스 조회로 사용하는 PostManager"""
+
+    def __init__(self, store, images_dir='post_images'):
+        self._lock = new_lock()
+        self.store = store
+        self.posts_file = None
+        self.likes_file = None
+        self.images_dir = images_dir
+        self.storage_mode = 'sqlite'
+        self.wal = None
+        self._image_jobs = {}  # image_path -> 처리 중인 작업 Future
+        self.image_catalog = ImageCatalog()  # 렌더링에 쓰는 검증된 이미지 정보
+        self._settle_pending_images()
+
+        # 이미지 저장 디렉토리 생성
+        if not os.path.exists(self.images_dir):
+            os.makedirs(self.images_dir)
+
+    @property
+    def posts_df(self):
+        """전체 게시물 테이블 (통계 화면 호환용)"""
+        return self.load_posts()
+
+    @property
+    def likes_df(self):
+        """전체 좋아요 테이블 (통계 화면 호환용)"""
+        return self.load_likes()
+
+    def _settle_pending_images(self):
+        """이전 실행에서 처리가 끝나지 않은 이미지 상태 정리 (pending 행만 조회)"""
+        rows = self.store.query("SELECT post_id, image_path FROM posts WHERE image_status = 'pending'")
+        for row in rows:
+            image_path = row['image_path']
+            ready = isinstance(image_path, str) and os.path.exists(image_path)
+            self._apply_set_image_status(row['post_id'], 'ready' if ready else 'failed')
+
+    def get_all_posts(self):
+        """전체 게시물 테이블"""
+        return self.load_posts()
+
+    def load_posts(self):
+        """posts 테이블 로드"""
+        return self._read_posts("SELECT * FROM posts ORDER BY post_id")
+
+    def _read_posts(self, sql, params=()):
+        """posts 조회 결과를 DataFrame으로 읽고 불리언 컬럼 정리"""
+        df = self.store.read_frame(sql, params)
+        df['is_repost'] = df['is_repost'].astype(bool)
+        df['has_image'] = df['has_image'].astype(bool)
+        return df
+
+    def load_likes(self):
+        """likes 테이블 로드"""
+        return self.store.read_frame("SELECT * FROM likes ORDER BY like_id")
+
+    def save_posts(self):
+        """쓰기는 즉시 반영되므로 별도 저장 없음"""
+        pass
+
+    def save_likes(self):
+        """쓰기는 즉시 반영되므로 별도 저장 없음"""
+        pass
+
+    def persist(self, op, data, posts=True, likes=False):
+        """_apply_* 단계에서 이미 기록되므로 별도 저장 없음"""
+        pass
+
+    def compact(self):
+        """SQLite는 변경 로그를 쓰지 않음"""
+        pass
+
+    def _row_to_post(self, row):
+        """DB 행을 게시물 dict로 변환"""
+        if row is None:
+            return None
+        row['is_repost'] = bool(row['is_repost'])
+        row['has_image'] = bool(row['has_image'])
+        return row
+
+    def _apply_create_post(self, post):
+        """게시물 추가 (같은 ID가 이미 있으면 무시)"""
+        self.store.execute(
+            f"INSERT OR IGNORE INTO posts ({', '.join(POST_COLUMNS)}) VALUES ({', '.join('?' * len(POST_COLUMNS))})",
+            [post.get(column) for column in POST_COLUMNS]
+        )
+
+    def _apply_add_like(self, like):
+        """좋아요 추가 및 게시물 좋아요 수 증가 (중복 적용 시 무시)"""
+        with self.store.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO likes (like_id, post_id, username, created_at) VALUES (?, ?, ?, ?)",
+                [_to_builtin(like[c]) for c in ('like_id', 'post_id', 'username', 'created_at')]
+            )
+            if cursor.rowcount:
+                conn.execute("UPDATE posts SET like_count = like_count + 1 WHERE post_id = ?",
+                             (_to_builtin(like['post_id']),))
+
+    def _apply_remove_like(self, post_id, username):
+        """좋아요 제거 및 게시물 좋아요 수 감소 (없으면 무시)"""
+        with self.store.transaction() as conn:
+            cursor = conn.execute("DELETE FROM likes WHERE post_id = ? AND username = ?",
+                                  (_to_builtin(post_id), username))
+            if cursor.rowcount:
+                conn.execute("UPDATE posts SET like_count = like_count - 1 WHERE post_id = ?",
+                             (_to_builtin(post_id),))
+
+    def _apply_set_repost_count(self, post_id, repost_count):
+        """게시물 리포스트 수 설정"""
+        self.store.execute("UPDATE posts SET repost_count = ? WHERE post_id = ?", (repost_count, post_id))
+
+    def image_ref_count(self, image_path):
+        """이미지를 참조하는 게시물 수 (image_path 인덱스 사용)"""
+        return self.store.query_one(
+            "SELECT COUNT(*) AS refs FROM posts WHERE image_path = ?", (image_path,)
+        )['refs']
+
+    def _apply_set_image_status(self, post_id, image_status):
+        """게시물 이미지 처리 상태 설정"""
+        self.store.execute("UPDATE posts SET image_status = ? WHERE post_id = ?", (image_status, post_id))
+
+    def _apply_delete_post(self, post_id):
+        """게시물과 관련 좋아요 삭제"""
+        post_id = _to_builtin(post_id)
+        with self.store.transaction() as conn:
+            conn.execute("DELETE FROM posts WHERE post_id = ?", (post_id,))
+            conn.execute("DELETE FROM likes WHERE post_id = ?", (post_id,))
+            # 리포스트 게시물들의 original_post_id를 None으로 설정 (삭제된 게시물 표시용)
+            conn.execute("UPDATE posts SET original_post_id = NULL WHERE original_post_id = ?", (post_id,))
+
+    def get_next_post_id(self):
+        """새로운 게시물 ID 생성"""
+        return self.store.query_one("SELECT COALESCE(MAX(post_id), 0) + 1 AS next_id FROM posts")['next_id']
+
+    def get_next_like_id(self):
+        """새로운 좋아요 ID 생성"""
+        return self.store.query_one("SELECT COALESCE(MAX(like_id), 0) + 1 AS next_id FROM likes")['next_id']
+
+    def get_post_by_id(self, post_id):
+        """게시물 ID로 게시물 조회"""
+        return self._row_to_post(self.store.query_one("SELECT * FROM posts WHERE post_id = ?", (post_id,)))
+
+    def get_posts_by_ids(self, post_ids):
+        """여러 게시물을 한 번에 조회 (post_id -> 게시물 dict, 없는 ID는 제외)"""
+        post_ids = [_to_builtin(post_id) for post_id in post_ids]
+        post_ids = [post_id for post_id in post_ids if post_id is not None]
+        if not post_ids:
+            return {}
+        rows = self.store.query(
+            f"SELECT * FROM posts WHERE post_id IN ({', '.join('?' * len(post_ids))})", post_ids
+        )
+        return {row['post_id']: self._row_to_post(row) for row in rows}
+
+    def _feed_conditions(self, kind=None, priority=None, usernames=None, exclude_users=None):
+        """피드 필터를 WHERE 조건 목록과 파라미터로 변환"""
+        conditions, params = [], []
+        for column, values, operator in (('post_kind', kind, 'IN'), ('priority', priority, 'IN'),
+                                         ('username', usernames, 'IN'), ('username', exclude_users, 'NOT IN')):
+            if values is None:
+                continue
+            values = [values] if isinstance(values, str) else list(values)
+            if not values:
+                conditions.append('0' if operator == 'IN' else '1')
+                continue
+            conditions.append(f"{column} {operator} ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return conditions, params
+
+    def get_posts_feed(self, limit=10, kind=None, priority=None, usernames=None, exclude_users=None):
+        """피드용 게시물 조회 (최신순, 필터는 limit 적용 전에 반영)"""
+        conditions, params = self._feed_conditions(kind, priority, usernames, exclude_users)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._read_posts(
+            f"SELECT * FROM posts{where} ORDER BY created_at DESC, post_id DESC LIMIT ?", params + [limit]
+        )
+
+    def get_posts_page(self, cursor=None, limit=10, kind=None, priority=None, usernames=None, exclude_users=None):
+        """커서 이후(더 오래된) 게시물 한 페이지 조회 (게시물 DataFrame, 다음 커서 또는 None)"""
+        conditions, params = self._feed_conditions(kind, priority, usernames, exclude_users)
+        if cursor is not None:
+            conditions.append("(created_at, post_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        df = self._read_posts(
+            f"SELECT * FROM posts{where} ORDER BY created_at DESC, post_id DESC LIMIT ?", params + [limit + 1]
+        )
+        if len(df) <= limit:
+            return df, None
+        df = df.head(limit)
+        last = df.iloc[-1]
+        return df, encode_cursor(last['created_at'], last['post_id'])
+
+    def get_user_posts(self, username, limit=None):
+        """사용자가 작성한 게시물 조회 (최신순, username/created_at 인덱스 사용)"""
+        return self._read_posts(
+            "SELECT * FROM posts WHERE username = ? ORDER BY created_at DESC, post_id DESC LIMIT ?",
+            (username, -1 if limit is None else limit)
+        )
+
+    def user_liked_post(self, post_id, username):
+        """사용자가 해당 게시물에 좋아요를 눌렀는지 확인"""
+        return self.store.query_one(
+            "SELECT 1 AS liked FROM likes WHERE post_id = ? AND username = ?", (post_id, username)
+        ) is not None
+
+    def liked_post_ids(self, username, post_ids):
+        """주어진 게시물 중 사용자가 좋아요를 누른 게시물 ID 집합"""
+        post_ids = [_to_builtin(post_id) for post_id in post_ids]
+        if not post_ids:
+            return set()
+        rows = self.store.query(
+            f"SELECT post_id FROM likes WHERE username = ? AND post_id IN ({', '.join('?' * len(post_ids))})",
+            [username] + post_ids
+        )
+        return {row['post_id'] for row in rows}
+
+    def get_post_likes(self, post_id):
+        """게시물의 좋아요 목록 조회"""
+        return self.store.read_frame(
+            "SELECT * FROM likes WHERE post_id = ? ORDER BY created_at DESC", (post_id,)
+        )
+
+    def get_user_likes(self, username):
+        """사용자가 누른 좋아요 목록 조회 (최신순)"""
+        return self.store.read_frame(
+            "SELECT * FROM likes WHERE username = ? ORDER BY created_at DESC", (username,)
+        )
+
+
+class SQLiteFollowManager(FollowManager):
+    """followers 테이블을 인덱스 조회로 사용하는 FollowManager"""
+
+    def __init__(self, store):
+        self._lock = new_lock()
+        self.store = store
+        self.followers_file = None
+
+    @property
+    def df(self):
+        """전체 팔로우 관계 테이블"""
+        return self.load_followers()
+
+    def load_followers(self):
+        """followers 테이블 로드"""
+        return self.store.read_frame("SELECT follower_id, followed_id FROM followers")
+
+    def save_followers(self):
+        """쓰기는 즉시 반영되므로 별도 저장 없음"""
+        pass
+
+    def _add_follow(self, follower_id, followed_id):
+        """팔로우 관계 추가"""
+        self.store.execute("INSERT OR IGNORE INTO followers (follower_id, followed_id) VALUES (?, ?)",
+                           (follower_id, followed_id))
+
+    def _remove_follow(self, follower_id, followed_id):
+        """팔로우 관계 제거"""
+        self.store.execute("DELETE FROM followers WHERE follower_id = ? AND followed_id = ?",
+                           (follower_id, followed_id))
+
+    def is_following(self, follower_id, followed_id):
+        """현재 사용자가 특정 사용자를 팔로우하는지 확인"""
+        return self.store.query_one(
+            "SELECT 1 AS following FROM followers WHERE follower_id = ? AND followed_id = ?",
+            (follower_id, followed_id)
+        ) is not None
+
+    def get_follower_count(self, user_id):
+        """특정 사용자의 팔로워 수 조회"""
+        return self.store.query_one(
+            "SELECT COUNT(*) AS cnt FROM followers WHERE followed_id = ?", (user_id,)
+        )['cnt']
+
+    def get_following_count(self, user_id):
+        """특정 사용자가 팔로우하는 사람 수 조회"""
+        return self.store.query_one(
+            "SELECT COUNT(*) AS cnt FROM followers WHERE follower_id = ?", (user_id,)
+        )['cnt']
+
+    def _count_by(self, column, user_ids):
+        """user_ids별 팔로우 관계 수를 GROUP BY 한 번으로 조회"""
+        user_ids = [_to_builtin(user_id) for user_id in user_ids]
+        if not user_ids:
+            return {}
+        rows = self.store.query(
+            f"SELECT {column} AS user_id, COUNT(*) AS cnt FROM followers "
+            f"WHERE {column} IN ({', '.join('?' * len(user_ids))}) GROUP BY {column}",
+            user_ids
+        )
+        counts = {row['user_id']: row['cnt'] for row in rows}
+        return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+    def follower_counts(self, user_ids):
+        """여러 사용자의 팔로워 수를 한 번에 조회 (user_id -> 팔로워 수)"""
+        return self._count_by('followed_id', user_ids)
+
+    def following_counts(self, user_ids):
+        """여러 사용자의 팔로잉 수를 한 번에 조회 (user_id -> 팔로잉 수)"""
+        return self._count_by('follower_id', user_ids)
+
+    def following_among(self, follower_id, user_ids):
+        """주어진 사용자 중 follower_id가 팔로우하는 사용자 ID 집합"""
+        user_ids = [_to_builtin(user_id) for user_id in user_ids]
+        if not user_ids:
+            return set()
+        rows = self.store.query(
+            f"SELECT followed_id FROM followers WHERE follower_id = ? "
+            f"AND followed_id IN ({', '.join('?' * len(user_ids))})",
+            [_to_builtin(follower_id)] + user_ids
+        )
+        return {row['followed_id'] for row in rows}
+
+
+class SQLiteFactoryManager(FactoryManager):
+    """factories/factory_posts 테이블에 행 단위로 기록하는 FactoryManager"""
+
+    def __init__(self, store):
+        self.store = store
+        super().__init__(factories_file=None, factory_posts_file=None)
+
+    @property
+    def factory_posts_df(self):
+        """전체 팩토리 포스트 테이블"""
+        return self.load_factory_posts()
+
+    @factory_posts_df.setter
+    def factory_posts_df(self, value):
+        # 팩토리 포스트는 테이블에 직접 기록되므로 메모리 사본을 두지 않음
+        pass
+
+    def load_factories(self):
+        """factories 테이블 로드"""
+        return self.store.read_frame("SELECT * FROM factories ORDER BY factory_id")
+
+    def load_factory_posts(self):
+        """factory_posts 테이블 로드"""
+        return self.store.read_frame("SELECT * FROM factory_posts ORDER BY post_id")
+
+    def _index_factory_posts(self):
+        """피드는 created_at 인덱스로 조회하므로 메모리 타임라인을 두지 않음"""
+        pass
+
+    def save_factories(self):
+        """쓰기는 행 단위로 즉시 반영되므로 별도 저장 없음"""
+        pass
+
+    def save_factory_posts(self):
+        """쓰기는 행 단위로 즉시 반영되므로 별도 저장 없음"""
+        pass
+
+    def _insert_factory(self, factory_row):
+        """팩토리 행 추가"""
+        super()._insert_factory(factory_row)
+        columns = list(factory_row.keys())
+        self.store.execute(
+            f"INSERT OR REPLACE INTO factories ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [factory_row[c] for c in columns]
+        )
+
+    def _update_factory_row(self, factory_id, values):
+        """팩토리 행의 마지막 상태 값 변경"""
+        super()._update_factory_row(factory_id, values)
+        assignments = ', '.join(f"{column} = ?" for column in values)
+        self.store.execute(
+            f"UPDATE factories SET {assignments} WHERE factory_id = ?",
+            list(values.values()) + [factory_id]
+        )
+
+    def _update_factory_rows(self, factory_ids, values):
+        """여러 팩토리 행의 마지막 상태 값을 한 트랜잭션으로 변경"""
+        super()._update_factory_rows(factory_ids, values)
+        columns = list(values)
+        assignments = ', '.join(f"{column} = ?" for column in columns)
+        self.store.executemany(
+            f"UPDATE factories SET {assignments} WHERE factory_id = ?",
+            [[values[column][i] for column in columns] + [factory_id] for i, factory_id in enumerate(factory_ids)]
+        )
+
+    def get_next_factory_post_id(self):
+        """새로운 팩토리 포스트 ID 생성"""
+        return self.store.query_one(
+            "SELECT COALESCE(MAX(post_id), 0) + 1 AS next_id FROM factory_posts"
+        )['next_id']
+
+    def _insert_factory_post(self, post):
+        """팩토리 포스트 추가"""
+        columns = list(post.keys())
+        self.store.execute(
+            f"INSERT INTO factory_posts ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [post[c] for c in columns]
+        )
+
+    def _insert_factory_posts(self, posts):
+        """여러 팩토리 포스트를 한 트랜잭션으로 추가"""
+        columns = list(posts[0].keys())
+        self.store.executemany(
+            f"INSERT INTO factory_posts ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [[post[c] for c in columns] for post in posts]
+        )
+
+    def get_factory_feed(self, limit=10):
+        """팩토리 피드 조회 (created_at 인덱스 사용)"""
+        return self.store.read_frame(
+            "SELECT * FROM factory_posts ORDER BY created_at DESC, post_id DESC LIMIT ?", (limit,)
+        )
+
+
+def _insert_frame(store, table, df, columns):
+    """DataFrame 행들을 테이블에 일괄 삽입"""
+    df = df.astype(object).where(df.notna(), None)
+    rows = [[row[c] if c in df.columns else None for c in columns] for row in df.to_dict('records')]
+    store.executemany(
+        f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        rows
+    )
+    return len(rows)
+
+
+def migrate_csv_to_sqlite(db_path='social_feed.db', users_file='users.csv', posts_file='posts.csv',
+                          likes_file='likes.csv', followers_file='followers.csv',
+                          factories_file='factories.csv', factory_posts_file='factory_posts.csv'):
+    """기존 CSV 파일들을 SQLite 데이터베이스로 한 번에 이전"""
+    store = SQLiteStore(db_path)
+
+    # 각 매니저의 로더를 그대로 사용해 컬럼/타입 보정을 동일하게 적용
+    users_df = AuthManager(users_file).df
+    post_manager = PostManager(posts_file, likes_file)
+    posts_df = post_manager.posts_df
+    followers_df = FollowManager(followers_file).df
+    factory_manager = FactoryManager(factories_file, factory_posts_file)
+
+    counts = {
+        'users': _insert_frame(store, 'users', users_df,
+                               ['id', 'username', 'password', 'created_at', 'profile_emoji']),
+        'posts': _insert_frame(store, 'posts', posts_df, POST_COLUMNS),
+        'likes': _insert_frame(store, 'likes', post_manager.likes_df,
+                               ['like_id', 'post_id', 'username', 'created_at']),
+        'followers': _insert_frame(store, 'followers', followers_df, ['follower_id', 'followed_id']),
+        'factories': _insert_frame(store, 'factories', factory_manager.factories_df,
+                                   list(factory_manager.factories_df.columns)),
+        'factory_posts': _insert_frame(store, 'factory_posts', factory_manager.factory_posts_df,
+                                       list(factory_manager.factory_posts_df.columns)),
+    }
+    return counts
+
+
+if __name__ == '__main__':
+    for table, count in migrate_csv_to_sqlite().items():
+        print(f"{table}: {count}행 이전 완료")
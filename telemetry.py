@@ -0,0 +1,383 @@
+# telemetry.py - 팩토리 센서 기록 저장소 (최근 값은 링 버퍼, 전체 기록은 추가 전용 바이너리 파일)
+import os
+from collections import deque
+import numpy as np
+import pandas as pd
+from locking import synchronized, new_lock
+
+TELEMETRY_METRICS = ('temperature', 'pressure', 'rpm', 'product_count')
+
+# 파일에 한 건씩 이어 쓰는 고정 크기 레코드
+RECORD_DTYPE = np.dtype([('timestamp', '<f8'), ('factory', '<u4')] + [(metric, '<f4') for metric in TELEMETRY_METRICS])
+
+
+# 집계 해상도 -> (구간 길이(초), 팩토리별로 보관할 완료 구간 수, None이면 전부)
+ROLLUP_RESOLUTIONS = {
+    '1min': (60, 60 * 48),
+    '1h': (3600, 24 * 90),
+    '1d': (86400, None),
+}
+ROLLUP_STATS = ('min', 'max', 'mean', 'last')
+
+
+def to_epoch(value):
+    """datetime/문자열 시각을 초 단위 숫자로 변환 (시간대 없는 현지 시각 그대로)"""
+    return pd.Timestamp(value).value / 1e9
+
+
+def unique_batches(codes):
+    """같은 번호가 한 묶음에 두 번 나오지 않도록 나눈 인덱스 묶음들 (원래 순서 유지)"""
+    remaining = np.arange(len(codes))
+    while len(remaining):
+        _, first = np.unique(codes[remaining], return_index=True)
+        batch = remaining[np.sort(first)]
+        yield batch
+        remaining = np.setdiff1d(remaining, batch, assume_unique=True)
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets로 모양을 유지하며 고를 threshold개 점의 인덱스"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # 첫 점과 마지막 점은 고정하고 가운데를 threshold - 2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 구간의 평균 점 (마지막 구간은 끝점)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # 이전에 고른 점, 다음 구간 평균과 이루는 삼각형이 가장 큰 점 선택
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+class Rollup:
+    """한 해상도의 팩토리별 구간 집계 (지표마다 최소/최대/평균/마지막 값)
+
+    팩토리마다 진행 중인 구간 하나는 배열로 갱신하고, 끝난 구간은 행으로 쌓아 둠
+    """
+
+    def __init__(self, seconds, retention=None):
+        self.seconds = seconds
+        self.retention = retention
+        self._closed = {}  # 팩토리 번호 -> 끝난 구간 행 (구간 시작, 지표별 min/max/mean/last)
+        metrics = len(TELEMETRY_METRICS)
+        self._bucket = np.zeros(0)  # 진행 중인 구간 시작 (-inf면 없음)
+        self._count = np.zeros(0, dtype=np.intp)
+        self._min = np.zeros((0, metrics))
+        self._max = np.zeros((0, metrics))
+        self._sum = np.zeros((0, metrics))
+        self._last = np.zeros((0, metrics))
+
+    def _ensure_rows(self, rows):
+        """팩토리 번호 rows개까지 담을 수 있도록 배열 확장 (두 배씩)"""
+        if rows <= len(self._bucket):
+            return
+        new_rows = max(rows, len(self._bucket) * 2, 8)
+        for name in ('_bucket', '_count', '_min', '_max', '_sum', '_last'):
+            old = getattr(self, name)
+            grown = np.zeros((new_rows,) + old.shape[1:], dtype=old.dtype)
+            grown[:len(old)] = old
+            if name == '_bucket':
+                grown[len(old):] = -np.inf
+            setattr(self, name, grown)
+
+    def _open_rows(self, codes):
+        """진행 중인 구간들을 (구간 시작, 지표별 min/max/mean/last) 행 배열로 변환"""
+        mean = self._sum[codes] / self._count[codes][:, None]
+        stats = np.stack([self._min[codes], self._max[codes], mean, self._last[codes]], axis=2)
+        return np.column_stack([self._bucket[codes], stats.reshape(len(codes), len(TELEMETRY_METRICS) * len(ROLLUP_STATS))])
+
+    def _close(self, codes):
+        """진행 중인 구간을 끝난 구간 목록으로 옮김"""
+        for code, row in zip(codes.tolist(), self._open_rows(codes)):
+            closed = self._closed.get(code)
+            if closed is None:
+                closed = self._closed[code] = deque(maxlen=self.retention)
+            closed.append(row)
+
+    def add(self, codes, timestamps, values):
+        """기록 묶음 반영 (codes: 팩토리 번호, values: 기록 x 지표 배열)"""
+        codes = np.asarray(codes, dtype=np.intp)
+        self._ensure_rows(int(codes.max()) + 1)
+        buckets = np.floor(np.broadcast_to(timestamps, codes.shape) / self.seconds) * self.seconds
+        for batch in unique_batches(codes):
+            rows = codes[batch]
+            current = self._bucket[rows]
+            # 늦게 도착한 기록은 진행 중인 구간에 합침
+            bucket = np.maximum(buckets[batch], current)
+            moved = bucket != current
+            self._close(rows[moved & (self._count[rows] > 0)])
+
+            started = rows[moved]
+            self._bucket[started] = bucket[moved]
+            self._count[started] = 0
+            self._min[started] = np.inf
+            self._max[started] = -np.inf
+            self._sum[started] = 0
+
+            batch_values = values[batch]
+            self._min[rows] = np.minimum(self._min[rows], batch_values)
+            self._max[rows] = np.maximum(self._max[rows], batch_values)
+            self._sum[rows] += batch_values
+            self._last[rows] = batch_values
+            self._count[rows] += 1
+
+    def load(self, codes, timestamps, values):
+        """파일 전체 기록으로 집계를 한 번에 계산 (시작 시 사용)"""
+        if not len(codes):
+            return
+        frame = pd.DataFrame(values, columns=list(TELEMETRY_METRICS))
+        frame['code'] = np.asarray(codes, dtype=np.intp)
+        frame['bucket'] = np.floor(np.asarray(timestamps) / self.seconds) * self.seconds
+        grouped = frame.groupby(['code', 'bucket'], sort=True)[list(TELEMETRY_METRICS)]
+        count = grouped.size().to_numpy()
+        mins, maxs, sums, lasts = (grouped.min().to_numpy(), grouped.max().to_numpy(),
+                                   grouped.sum().to_numpy(), grouped.last().to_numpy())
+        keys = grouped.size().index
+        group_codes = keys.get_level_values('code').to_numpy()
+        group_buckets = keys.get_level_values('bucket').to_numpy()
+
+        self._ensure_rows(int(group_codes.max()) + 1)
+        # 팩토리별 마지막 구간은 진행 중인 구간으로, 나머지는 끝난 구간으로
+        is_last = np.append(group_codes[1:] != group_codes[:-1], True)
+        last_codes = group_codes[is_last]
+        self._bucket[last_codes] = group_buckets[is_last]
+        self._count[last_codes] = count[is_last]
+        self._min[last_codes] = mins[is_last]
+        self._max[last_codes] = maxs[is_last]
+        self._sum[last_codes] = sums[is_last]
+        self._last[last_codes] = lasts[is_last]
+
+        closed = ~is_last
+        stats = np.stack([mins[closed], maxs[closed], sums[closed] / count[closed][:, None], lasts[closed]], axis=2)
+        rows = np.column_stack([group_buckets[closed],
+                                stats.reshape(int(closed.sum()), len(TELEMETRY_METRICS) * len(ROLLUP_STATS))])
+        for code, row in zip(group_codes[closed].tolist(), rows):
+            closed_rows = self._closed.get(code)
+            if closed_rows is None:
+                closed_rows = self._closed[code] = deque(maxlen=self.retention)
+            closed_rows.append(row)
+
+    def rows(self, code, start=-np.inf, end=np.inf):
+        """팩토리의 구간 행 배열 (진행 중인 구간 포함, 구간 시작이 [start, end]인 것만)"""
+        rows = list(self._closed.get(code, ()))
+        if code < len(self._count) and self._count[code] > 0:
+            rows.extend(self._open_rows(np.array([code])))
+        if not rows:
+            return np.zeros((0, 1 + len(TELEMETRY_METRICS) * len(ROLLUP_STATS)))
+        rows = np.array(rows)
+        # 구간 시작이 start 이전이어도 start를 포함하는 구간은 포함
+        mask = (rows[:, 0] + self.seconds > start) & (rows[:, 0] <= end)
+        return rows[mask]
+
+
+class TelemetryStore:
+    """팩토리마다 지표별 최근 capacity개를 링 버퍼에 두고, 모든 기록은 파일 끝에 추가
+
+    factory_id는 처음 기록될 때 번호를 받아 {파일명}.factories에 한 줄씩 추가됨
+    """
+
+    def __init__(self, path='telemetry.bin', capacity=120):
+        self._lock = new_lock()
+        self.path = path
+        self.factories_path = f"{path}.factories"
+        self.capacity = capacity
+        self._codes = {}  # factory_id -> 번호 (링 버퍼 행)
+        self._timestamps = np.zeros((0, capacity))
+        self._values = {metric: np.zeros((0, capacity), dtype=np.float32) for metric in TELEMETRY_METRICS}
+        self._heads = np.zeros(0, dtype=np.intp)  # 다음에 쓸 칸
+        self._counts = np.zeros(0, dtype=np.intp)  # 링 버퍼에 든 개수
+        self._evicted = np.zeros(0, dtype=bool)  # 링 버퍼보다 오래된 기록이 파일에만 있는지
+        self._rollups = {name: Rollup(seconds, retention) for name, (seconds, retention) in ROLLUP_RESOLUTIONS.items()}
+        self._load()
+
+    def _load(self):
+        """팩토리 번호 목록을 읽고 파일 끝부분으로 링 버퍼 채우기"""
+        if os.path.exists(self.factories_path):
+            with open(self.factories_path, encoding='utf-8') as f:
+                for factory_id in f.read().splitlines():
+                    self._register(factory_id)
+
+        records = self._read_records()
+        if len(records):
+            values = np.column_stack([records[metric] for metric in TELEMETRY_METRICS]).astype(float)
+            for rollup in self._rollups.values():
+                rollup.load(records['factory'], records['timestamp'], values)
+
+        # 파일 끝의 연속 구간만 쓰므로 팩토리별로 링 버퍼 이후의 기록은 빠짐없이 들어감
+        tail = records[-self.capacity * max(len(self._codes), 1):]
+        if len(tail) < len(records):
+            self._evicted[:len(self._codes)] = True
+        if len(tail):
+            self._push(tail['factory'], tail['timestamp'], {metric: tail[metric] for metric in TELEMETRY_METRICS})
+
+    def _read_records(self):
+        """파일 전체를 레코드 배열로 매핑 (파일이 없으면 빈 배열)"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < RECORD_DTYPE.itemsize:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        count = os.path.getsize(self.path) // RECORD_DTYPE.itemsize
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def _register(self, factory_id):
+        """새 팩토리에 번호와 링 버퍼 행 배정 (행 배열은 두 배씩 늘림)"""
+        code = len(self._codes)
+        self._codes[factory_id] = code
+        if code == len(self._heads):
+            rows = max(code * 2, 8)
+            self._timestamps = self._grown(self._timestamps, rows)
+            for metric in TELEMETRY_METRICS:
+                self._values[metric] = self._grown(self._values[metric], rows)
+            self._heads = self._grown(self._heads, rows)
+            self._counts = self._grown(self._counts, rows)
+            self._evicted = self._grown(self._evicted, rows)
+        return code
+
+    @staticmethod
+    def _grown(array, rows):
+        """앞쪽 행을 유지한 채 rows행으로 늘린 배열"""
+        grown = np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _codes_for(self, factory_ids):
+        """팩토리 번호 배열 (처음 보는 팩토리는 번호를 배정하고 목록 파일에 한 번에 추가)"""
+        new_ids = [factory_id for factory_id in dict.fromkeys(factory_ids) if factory_id not in self._codes]
+        if new_ids:
+            for factory_id in new_ids:
+                self._register(factory_id)
+            with open(self.factories_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{factory_id}\n" for factory_id in new_ids))
+        return np.array([self._codes[factory_id] for factory_id in factory_ids], dtype=np.intp)
+
+    def _push(self, codes, timestamps, values):
+        """링 버퍼에 기록 추가 (같은 팩토리가 여러 번 나오면 순서대로 한 건씩)"""
+        codes = np.asarray(codes, dtype=np.intp)
+        timestamps = np.broadcast_to(np.asarray(timestamps, dtype=float), codes.shape)
+        values = {metric: np.broadcast_to(np.asarray(values[metric], dtype=np.float32), codes.shape)
+                  for metric in TELEMETRY_METRICS}
+        # 한 번에 팩토리마다 한 건씩만 써야 같은 칸을 덮어쓰지 않음
+        for batch in unique_batches(codes):
+            rows = codes[batch]
+            slots = self._heads[rows]
+            self._timestamps[rows, slots] = timestamps[batch]
+            for metric in TELEMETRY_METRICS:
+                self._values[metric][rows, slots] = values[metric][batch]
+            self._evicted[rows] |= self._counts[rows] == self.capacity
+            self._heads[rows] = (slots + 1) % self.capacity
+            self._counts[rows] = np.minimum(self._counts[rows] + 1, self.capacity)
+
+    @synchronized
+    def record_batch(self, factory_ids, timestamp, values):
+        """여러 팩토리의 같은 시각 기록 추가 (values: 지표 -> factory_ids 순서의 값 배열)"""
+        if not len(factory_ids):
+            return
+        codes = self._codes_for(factory_ids)
+        timestamp = to_epoch(timestamp)
+
+        records = np.zeros(len(codes), dtype=RECORD_DTYPE)
+        records['timestamp'] = timestamp
+        records['factory'] = codes
+        for metric in TELEMETRY_METRICS:
+            records[metric] = values[metric]
+        with open(self.path, 'ab') as f:
+            records.tofile(f)
+
+        self._push(codes, timestamp, values)
+        matrix = np.column_stack([records[metric] for metric in TELEMETRY_METRICS]).astype(float)
+        for rollup in self._rollups.values():
+            rollup.add(codes, timestamp, matrix)
+
+    def record(self, factory_id, timestamp, values):
+        """팩토리 한 곳의 기록 추가 (values: 지표 -> 값)"""
+        self.record_batch([factory_id], timestamp, {metric: [values[metric]] for metric in TELEMETRY_METRICS})
+
+    def _ring_frame(self, code):
+        """링 버퍼 내용을 오래된 순으로 (timestamp, 지표별 값) 배열로 반환"""
+        count = self._counts[code]
+        order = (self._heads[code] - count + np.arange(count)) % self.capacity
+        return self._timestamps[code, order], {metric: self._values[metric][code, order] for metric in TELEMETRY_METRICS}
+
+    @synchronized
+    def history(self, factory_id, start=None, end=None):
+        """팩토리의 [start, end] 구간 기록을 시간순 DataFrame으로 조회
+
+        링 버퍼가 구간 시작 이후를 모두 담고 있으면 메모리에서, 아니면 파일에서 읽음
+        """
+        columns = ['timestamp', *TELEMETRY_METRICS]
+        code = self._codes.get(factory_id)
+        if code is None:
+            return pd.DataFrame(columns=columns)
+
+        start = -np.inf if start is None else to_epoch(start)
+        end = np.inf if end is None else to_epoch(end)
+
+        timestamps, values = self._ring_frame(code)
+        if len(timestamps) == 0 or (self._evicted[code] and timestamps[0] > start):
+            records = self._read_records()
+            records = records[records['factory'] == code]
+            timestamps = records['timestamp']
+            values = {metric: records[metric] for metric in TELEMETRY_METRICS}
+
+        mask = (timestamps >= start) & (timestamps <= end)
+        frame = pd.DataFrame({metric: np.asarray(values[metric][mask], dtype=float) for metric in TELEMETRY_METRICS})
+        frame.insert(0, 'timestamp', pd.to_datetime(np.asarray(timestamps[mask]), unit='s'))
+        return frame[columns]
+
+    @synchronized
+    def rollup(self, factory_id, resolution, start=None, end=None):
+        """팩토리의 resolution('1min'/'1h'/'1d') 구간 집계를 시간순 DataFrame으로 조회
+
+        컬럼: timestamp(구간 시작), {지표}_min/_max/_mean/_last
+        """
+        columns = ['timestamp'] + [f"{metric}_{stat}" for metric in TELEMETRY_METRICS for stat in ROLLUP_STATS]
+        code = self._codes.get(factory_id)
+        if code is None:
+            return pd.DataFrame(columns=columns)
+
+        start = -np.inf if start is None else to_epoch(start)
+        end = np.inf if end is None else to_epoch(end)
+        rows = self._rollups[resolution].rows(code, start, end)
+        frame = pd.DataFrame(rows[:, 1:], columns=columns[1:])
+        frame.insert(0, 'timestamp', pd.to_datetime(rows[:, 0], unit='s'))
+        return frame
+
+    def first_timestamp(self, factory_id):
+        """팩토리의 가장 오래된 기록 구간 시작 (기록이 없으면 None)"""
+        daily = self.rollup(factory_id, '1d')
+        return None if daily.empty else daily['timestamp'].iloc[0]
+
+    def trend(self, factory_id, metric, start=None, end=None, max_points=300):
+        """차트용 추이 (구간 최소/평균/최대를 최대 max_points개 점으로)
+
+        구간 수가 max_points의 8배 이내인 가장 세밀한 집계를 고르고, 남는 점은 LTTB로 줄임
+        """
+        columns = ['timestamp', 'min', 'mean', 'max']
+        if start is None:
+            start = self.first_timestamp(factory_id)
+            if start is None:
+                return pd.DataFrame(columns=columns)
+        span = (end or pd.Timestamp.now()) - pd.Timestamp(start)
+
+        resolution = list(ROLLUP_RESOLUTIONS)[-1]
+        for name, (seconds, _) in ROLLUP_RESOLUTIONS.items():
+            if span.total_seconds() / seconds <= max_points * 8:
+                resolution = name
+                break
+
+        frame = self.rollup(factory_id, resolution, start, end)
+        frame = frame.rename(columns={f"{metric}_{stat}": stat for stat in ('min', 'mean', 'max')})[columns]
+        keep = lttb_indices(frame['timestamp'].astype('int64').to_numpy(), frame['mean'].to_numpy(), max_points)
+        return frame.iloc[keep].reset_index(drop=True)
@@ -0,0 +1,82 @@
+# timeline.py - 작성 시각 순으로 유지되는 게시물 ID 인덱스
+import base64
+import json
+from bisect import bisect_left, insort
+
+
+def encode_cursor(created_at, item_id):
+    """(created_at, id) 위치를 불투명한 커서 문자열로 변환"""
+    raw = json.dumps([str(created_at), int(item_id)], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """커서 문자열을 (created_at, id)로 복원 (잘못된 커서는 ValueError)"""
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"잘못된 커서입니다: {cursor}") from e
+
+
+class Timeline:
+    """(created_at, id) 순으로 정렬된 ID 목록 (삭제는 톰스톤으로 표시)"""
+
+    def __init__(self, compact_ratio=0.5):
+        self._entries = []  # (created_at, id) 오름차순
+        self._dead = set()  # 삭제 표시된 ID
+        self.compact_ratio = compact_ratio
+
+    def __len__(self):
+        return len(self._entries) - len(self._dead)
+
+    def add(self, created_at, item_id):
+        """항목 추가 (대부분 최신 항목이라 끝에 바로 붙음)"""
+        entry = (str(created_at), item_id)
+        if item_id in self._dead:
+            # 삭제 후 같은 ID가 다시 쓰이면 옛 항목부터 정리
+            self.compact()
+        if not self._entries or self._entries[-1] <= entry:
+            self._entries.append(entry)
+        else:
+            insort(self._entries, entry)
+
+    def remove(self, item_id):
+        """항목에 삭제 표시 (쌓이면 한 번에 정리)"""
+        self._dead.add(item_id)
+        if len(self._dead) > len(self._entries) * self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        """삭제 표시된 항목을 목록에서 실제로 제거"""
+        # 제자리에서 고치지 않고 새 목록/집합으로 바꿔 끼워서 읽는 중인 호출에 영향이 없게 함
+        self._entries = [entry for entry in self._entries if entry[1] not in self._dead]
+        self._dead = set()
+
+    def latest(self, limit=None, keep=None):
+        """최신순으로 최대 limit개의 ID 반환 (keep이 주어지면 그 안의 ID만)"""
+        # compact가 목록을 새로 바꿔 끼워도 이번 호출은 처음 잡은 목록만 읽음
+        entries, dead = self._entries, self._dead
+        ids = []
+        for _, item_id in reversed(entries):
+            if limit is not None and len(ids) >= limit:
+                break
+            if item_id not in dead and (keep is None or item_id in keep):
+                ids.append(item_id)
+        return ids
+
+    def page(self, cursor=None, limit=10, keep=None):
+        """cursor 위치보다 오래된 항목을 최신순으로 최대 limit개 반환 (ID 목록, 다음 커서)"""
+        # 길이 계산과 인덱싱이 같은 목록을 보도록 한 번만 읽음 (compact는 새 목록으로 바꿔 끼움)
+        all_entries, dead = self._entries, self._dead
+        end = len(all_entries) if cursor is None else bisect_left(all_entries, decode_cursor(cursor))
+        entries = []
+        for index in range(end - 1, -1, -1):
+            entry = all_entries[index]
+            if entry[1] in dead or (keep is not None and entry[1] not in keep):
+                continue
+            if len(entries) == limit:
+                # 다음 페이지가 남아 있으면 이번 페이지 마지막 항목이 다음 커서
+                return [item_id for _, item_id in entries], encode_cursor(*entries[-1])
+            entries.append(entry)
+        return [item_id for _, item_id in entries], None
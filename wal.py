@@ -0,0 +1,60 @@
+# wal.py - 추가 전용 변경 로그 (Write-Ahead Log)
+import json
+import os
+
+
+def _to_builtin(value):
+    """numpy 스칼라 등 JSON 직렬화가 안 되는 값을 기본 타입으로 변환"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class WriteAheadLog:
+    """변경 사항을 한 줄짜리 JSON 레코드로 파일 끝에 추가하는 로그"""
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.record_count = 0
+
+    def append(self, op, data):
+        """변경 레코드 하나를 로그 끝에 추가"""
+        record = json.dumps({'op': op, 'data': data}, ensure_ascii=False, default=_to_builtin)
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(record + '\n')
+            f.flush()
+        self.record_count += 1
+
+    def read(self):
+        """로그에 기록된 레코드를 순서대로 반환"""
+        records = []
+        if not os.path.exists(self.log_file):
+            self.record_count = 0
+            return records
+
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 쓰는 도중 중단된 마지막 줄은 무시
+                    break
+
+        self.record_count = len(records)
+        return records
+
+    def clear(self):
+        """스냅샷에 반영된 로그 비우기"""
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        self.record_count = 0
+
+
+def write_snapshot(df, path):
+    """DataFrame을 임시 파일에 쓴 뒤 교체하여 스냅샷을 원자적으로 저장"""
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)